@@ -5,7 +5,7 @@ import time
 from typing import Dict, List, Any
 
 # Import our workflow
-from src.workflow import run_documentation_workflow
+from src.workflow import run_documentation_workflow, stream_documentation_workflow
 from src.confluence_updater import get_confluence_space_key
 
 # Load environment variables
@@ -105,6 +105,40 @@ analyze_directories = st.checkbox("Analyze directory structure", value=True)
 tab1, tab2 = st.tabs(["Generate Documentation", "Documentation Preview"])
 
 with tab1:
+    if st.button("Estimate Cost", help="List and filter files only, then estimate tokens, cost and wall time without calling the LLM.", disabled=not (repo_owner and repo_name)):
+        if not os.getenv("GITHUB_TOKEN"):
+            st.error("GitHub token is missing. Please configure it in the sidebar.")
+        else:
+            with st.spinner("Listing files and counting tokens..."):
+                result = run_documentation_workflow(
+                    repo_owner=repo_owner,
+                    repo_name=repo_name,
+                    repo_path=repo_path,
+                    dry_run=True
+                )
+            
+            if result.get("error"):
+                st.error(f"Error: {result['error']}")
+            else:
+                estimate = result["estimate"]
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Files to document", estimate["files"])
+                col2.metric("Tokens", f"{estimate['prompt_tokens'] + estimate['completion_tokens']:,}")
+                col3.metric("Estimated cost", f"${estimate['cost']:.2f}")
+                col4.metric("Estimated wall time", f"{estimate['wall_seconds'] / 60:.1f} min")
+                
+                st.caption(
+                    f"{estimate['requests']} requests to {estimate['model']}: {estimate['prompt_tokens']:,} prompt tokens "
+                    f"({'counted with tiktoken' if estimate['tokenizer'] == 'tiktoken' else 'estimated'}) and "
+                    f"{estimate['completion_tokens']:,} projected completion tokens. Skipped: "
+                    + ", ".join(f"{count} {reason}" for reason, count in estimate["skipped"].items())
+                )
+                
+                st.markdown("#### Cost by directory")
+                st.dataframe(estimate["directories"], use_container_width=True)
+                st.markdown("#### Most expensive files")
+                st.dataframe(estimate["top_files"], use_container_width=True)
+    
     if st.button("Generate Documentation", type="primary", disabled=not (repo_owner and repo_name)):
         if not os.getenv("GITHUB_TOKEN"):
             st.error("GitHub token is missing. Please configure it in the sidebar.")
@@ -122,14 +156,44 @@ with tab1:
                 status_text.text("Fetching code from GitHub...")
                 progress_bar.progress(10)
                 
-                # Run the workflow
-                result = run_documentation_workflow(
+                # Run the workflow, showing each file's documentation while it is written
+                result = {}
+                previews = {}
+                file_count = 0
+                done_count = 0
+                for event in stream_documentation_workflow(
                     repo_owner=repo_owner,
                     repo_name=repo_name,
                     repo_path=repo_path,
                     confluence_space_key=os.getenv("CONFLUENCE_SPACE_KEY", "DEV"),
                     parent_page_id=os.getenv("PARENT_PAGE_ID", "")
-                )
+                ):
+                    if event["event"] == "files":
+                        file_count = len(event["files"])
+                        status_text.text(f"Documenting {file_count} files...")
+                        progress_bar.progress(20)
+                        continue
+                    if event["event"] == "done":
+                        result = event["state"]
+                        continue
+                    
+                    path = event["path"] if event["event"] == "token" else event["file"]["path"]
+                    if path not in previews:
+                        with st.expander(path, expanded=True):
+                            previews[path] = {"placeholder": st.empty(), "text": "", "rendered": 0.0}
+                    preview = previews[path]
+                    
+                    if event["event"] == "token":
+                        # Re-render at most ten times a second per file
+                        preview["text"] += event["delta"]
+                        if time.time() - preview["rendered"] > 0.1:
+                            preview["placeholder"].markdown(preview["text"])
+                            preview["rendered"] = time.time()
+                    else:
+                        preview["placeholder"].markdown(event["file"]["documentation"])
+                        done_count += 1
+                        status_text.text(f"Documented {done_count} of {file_count} files...")
+                        progress_bar.progress(20 + int(75 * done_count / max(file_count, 1)))
                 
                 # Update progress
                 progress_bar.progress(100)
@@ -141,6 +205,15 @@ with tab1:
                     file_count = len(result.get("files", []))
                     st.markdown(f'<div class="status-box success-box">Successfully documented {file_count} files and updated Confluence!</div>', unsafe_allow_html=True)
                     
+                    saved_calls = result.get("report", {}).get("dedup_saved_calls", 0)
+                    if saved_calls:
+                        st.info(f"{saved_calls} LLM calls were saved by documenting identical files only once.")
+                    
+                    routes = result.get("report", {}).get("routes", {})
+                    if routes:
+                        st.markdown("#### Model routes")
+                        st.dataframe([{"route": name, **route} for name, route in routes.items()], use_container_width=True)
+                    
                     # Store files in session state for preview
                     st.session_state.files = result.get("files", [])
                     
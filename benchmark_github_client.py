@@ -0,0 +1,53 @@
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+
+from src.github_client import github_get
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the GitHub contents API"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        body = b'[{"name": "app.py", "path": "app.py", "type": "file"}]'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+def measure(label: str, get, url: str, count: int) -> float:
+    """Send count requests with get and print the achieved rate"""
+    start = time.perf_counter()
+    for _ in range(count):
+        response = get(url)
+        response.raise_for_status()
+        response.json()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed
+    print(f"{label:<28} {rate:10.1f} requests/s")
+    return rate
+
+def main():
+    """Compare bare requests.get with the pooled GitHub client"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/repos/owner/repo/contents/"
+    
+    print(f"=== GitHub client benchmark ({count} requests) ===")
+    before = measure("requests.get (no session)", requests.get, url, count)
+    after = measure("github_get (pooled session)", github_get, url, count)
+    print(f"Speedup: {after / before:.2f}x")
+    
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+import requests
+import tarfile
+from typing import Callable, Dict, Any, Iterator, Optional
+
+from src.github_client import github_get
+from src.github_fetcher import GITHUB_MAX_FILE_BYTES, git_blob_sha, is_binary_content, resolve_ref
+
+def iter_archive_files(
+    repo_owner: str,
+    repo_name: str,
+    path: str = "",
+    ref: Optional[str] = None,
+    file_filter: Optional[Callable[[str], bool]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the files of a repository from its tarball
+    
+    The archive is downloaded once and read entry by entry, so neither the
+    archive nor unselected files are ever held in memory or written to disk.
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        path: Path within the repository
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+        file_filter: Predicate on the file path deciding which files to read
+        
+    Yields:
+        File information dictionaries with their content already filled in
+    """
+    prefix = path.strip("/")
+    
+    try:
+        commit_sha, _ = resolve_ref(repo_owner, repo_name, ref)
+    except requests.exceptions.RequestException as e:
+        print(f"Error resolving GitHub ref: {str(e)}")
+        return
+    
+    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/tarball/{commit_sha}"
+    
+    try:
+        with github_get(url, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            
+            with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+                for member in archive:
+                    if not member.isfile():
+                        continue
+                    
+                    # Entries are nested under a single "<owner>-<repo>-<sha>/" directory
+                    file_path = member.name.split("/", 1)[-1]
+                    if prefix and not file_path.startswith(prefix + "/"):
+                        continue
+                    if file_filter and not file_filter(file_path):
+                        continue
+                    if member.size > GITHUB_MAX_FILE_BYTES:
+                        print(f"Skipping {file_path}: {member.size} bytes exceeds the {GITHUB_MAX_FILE_BYTES} byte limit")
+                        continue
+                    
+                    data = archive.extractfile(member).read()
+                    if is_binary_content(data):
+                        continue
+                    yield {
+                        "name": file_path.rsplit("/", 1)[-1],
+                        "path": file_path,
+                        "download_url": f"https://raw.githubusercontent.com/{repo_owner}/{repo_name}/{commit_sha}/{file_path}",
+                        "sha": git_blob_sha(data),
+                        "size": len(data),
+                        "content": data.decode("utf-8", errors="replace"),
+                        "documentation": ""
+                    }
+    except (requests.exceptions.RequestException, tarfile.TarError) as e:
+        print(f"Error streaming repository archive: {str(e)}")
\ No newline at end of file
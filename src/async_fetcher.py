@@ -0,0 +1,225 @@
+import asyncio
+import json
+import os
+from typing import Callable, Dict, Any, List, Optional
+from urllib.parse import urlparse
+import aiohttp
+from dotenv import load_dotenv
+
+from src.github_client import (
+    GITHUB_CONNECT_TIMEOUT,
+    GITHUB_HOSTS,
+    GITHUB_MAX_RETRIES,
+    GITHUB_READ_TIMEOUT,
+    backoff_delay,
+    is_retryable,
+    retry_after_seconds
+)
+from src.github_fetcher import DOWNLOAD_CHUNK_BYTES, GITHUB_MAX_FILE_BYTES, is_binary_content
+
+load_dotenv()
+
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+# Maximum number of GitHub requests in flight at once
+GITHUB_MAX_IN_FLIGHT = int(os.getenv("GITHUB_MAX_IN_FLIGHT", "16"))
+
+async def _read_text(response: aiohttp.ClientResponse, max_bytes: int) -> str:
+    """Read a response body as text, giving up early on binary or oversized files"""
+    content_length = response.headers.get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        print(f"Skipping {response.url}: {content_length} bytes exceeds the {max_bytes} byte limit")
+        return ""
+    
+    chunks = []
+    total = 0
+    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_BYTES):
+        if not chunks and is_binary_content(chunk):
+            return ""
+        total += len(chunk)
+        if total > max_bytes:
+            print(f"Skipping {response.url}: exceeds the {max_bytes} byte limit")
+            return ""
+        chunks.append(chunk)
+    return b"".join(chunks).decode("utf-8", errors="replace")
+
+async def _get_text(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    url: str,
+    params: Optional[Dict[str, str]] = None,
+    max_bytes: Optional[int] = None
+) -> str:
+    """Send a GET request with bounded parallelism, retrying transient failures and capping bodies at max_bytes"""
+    headers = {}
+    if GITHUB_TOKEN and urlparse(url).hostname in GITHUB_HOSTS:
+        headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    
+    attempt = 0
+    while True:
+        try:
+            async with semaphore:
+                async with session.get(url, headers=headers, params=params) as response:
+                    if max_bytes is not None and response.status < 400:
+                        return await _read_text(response, max_bytes)
+                    body = await response.text(errors="replace")
+                    if attempt < GITHUB_MAX_RETRIES and is_retryable(response.status, response.headers, body):
+                        delay = backoff_delay(attempt, retry_after_seconds(response.headers))
+                    else:
+                        response.raise_for_status()
+                        return body
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt >= GITHUB_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+        
+        # Sleep outside the semaphore so waiting retries do not hold a slot
+        await asyncio.sleep(delay)
+        attempt += 1
+
+async def fetch_repo_files_async(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    repo_owner: str,
+    repo_name: str,
+    path: str = "",
+    ref: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fetch the entries of one repository directory
+    
+    Args:
+        session: HTTP session to use
+        semaphore: Semaphore bounding the number of requests in flight
+        repo_owner: Repository owner
+        repo_name: Repository name
+        path: Path within the repository
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+        
+    Returns:
+        List of file information dictionaries, as returned by fetch_repo_files
+    """
+    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{path}"
+    params = {"ref": ref} if ref else None
+    
+    try:
+        return json.loads(await _get_text(session, semaphore, url, params))
+    except aiohttp.ClientError as e:
+        print(f"Error fetching GitHub data: {str(e)}")
+        return []
+
+async def get_file_content_async(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    download_url: str,
+    max_bytes: int = GITHUB_MAX_FILE_BYTES
+) -> str:
+    """
+    Get content of a file from GitHub
+    
+    Args:
+        session: HTTP session to use
+        semaphore: Semaphore bounding the number of requests in flight
+        download_url: URL to download the file content
+        max_bytes: Size above which the download is abandoned
+        
+    Returns:
+        File content as string, empty for binary or oversized files, as
+        returned by get_file_content
+    """
+    try:
+        return await _get_text(session, semaphore, download_url, max_bytes=max_bytes)
+    except aiohttp.ClientError as e:
+        print(f"Error fetching file content: {str(e)}")
+        return ""
+
+async def _fetch_files(
+    repo_owner: str,
+    repo_name: str,
+    path: str,
+    ref: Optional[str],
+    file_filter: Optional[Callable[[str], bool]],
+    max_in_flight: int
+) -> List[Dict[str, Any]]:
+    """Walk a repository breadth-first, downloading selected files as they are discovered"""
+    semaphore = asyncio.Semaphore(max_in_flight)
+    timeout = aiohttp.ClientTimeout(sock_connect=GITHUB_CONNECT_TIMEOUT, sock_read=GITHUB_READ_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=max_in_flight)
+    
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        files = []
+        downloads = []
+        copies = []
+        first_copies = {}
+        pending = [path]
+        
+        while pending:
+            listings = await asyncio.gather(*[
+                fetch_repo_files_async(session, semaphore, repo_owner, repo_name, directory, ref)
+                for directory in pending
+            ])
+            pending = []
+            for listing in listings:
+                # A path naming a file is answered with that file alone, not a list
+                if isinstance(listing, dict):
+                    listing = [listing]
+                for entry in listing:
+                    if entry["type"] == "dir":
+                        pending.append(entry["path"])
+                    elif entry["type"] == "file" and (not file_filter or file_filter(entry["path"])):
+                        file = {
+                            "name": entry["name"],
+                            "path": entry["path"],
+                            "download_url": entry["download_url"],
+                            "sha": entry["sha"],
+                            "size": entry["size"],
+                            "content": "",
+                            "documentation": ""
+                        }
+                        files.append(file)
+                        
+                        # Files sharing a blob SHA are byte-identical; only the first copy is downloaded
+                        if file["sha"] in first_copies:
+                            copies.append((file, first_copies[file["sha"]]))
+                        elif file["size"] > GITHUB_MAX_FILE_BYTES:
+                            print(f"Skipping {file['path']}: {file['size']} bytes exceeds the {GITHUB_MAX_FILE_BYTES} byte limit")
+                        else:
+                            first_copies[file["sha"]] = file
+                            downloads.append((file, asyncio.create_task(
+                                get_file_content_async(session, semaphore, file["download_url"])
+                            )))
+        
+        contents = await asyncio.gather(*[task for _, task in downloads])
+        for (file, _), content in zip(downloads, contents):
+            file["content"] = content
+        for file, first_copy in copies:
+            file["content"] = first_copy["content"]
+        return files
+
+def fetch_files_concurrently(
+    repo_owner: str,
+    repo_name: str,
+    path: str = "",
+    ref: Optional[str] = None,
+    file_filter: Optional[Callable[[str], bool]] = None,
+    max_in_flight: int = GITHUB_MAX_IN_FLIGHT
+) -> List[Dict[str, Any]]:
+    """
+    List a repository path and download the selected files concurrently
+    
+    Directory listings of each level run in parallel and every file download
+    starts as soon as its directory has been listed, so the wall time follows
+    the deepest path rather than the number of files.
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        path: Path within the repository
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+        file_filter: Predicate on the file path deciding which files to download
+        max_in_flight: Maximum number of concurrent requests
+        
+    Returns:
+        File information dictionaries with their content already filled in
+    """
+    return asyncio.run(_fetch_files(repo_owner, repo_name, path, ref, file_filter, max_in_flight))
\ No newline at end of file
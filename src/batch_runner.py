@@ -0,0 +1,271 @@
+import os
+import json
+import hashlib
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import openai
+from langchain.schema import BaseMessage, SystemMessage
+from dotenv import load_dotenv
+
+from src.code_analyzer import (
+    OPENAI_API_KEY,
+    OPENAI_MAX_TOKENS,
+    OPENAI_TEMPERATURE,
+    build_file_messages,
+    cache_documentation,
+    is_documentation_cached,
+    route_files
+)
+from src.run_state import repository_state_path, write_json_atomically
+
+load_dotenv()
+
+# Where submitted batches are remembered, so a restarted run picks them up again
+BATCH_STATE_DIR = os.getenv(
+    "BATCH_STATE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "documentation-generator", "batches")
+)
+
+# Batch API settings; OPENAI_BASE_URL points the client at another endpoint
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "60"))
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Statuses after which a batch no longer changes
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+def _batch_state_path(repo_owner: str, repo_name: str, repo_path: str) -> str:
+    """Get the file holding the pending batches of a repository path"""
+    return repository_state_path(BATCH_STATE_DIR, repo_owner, repo_name, repo_path)
+
+def load_batch_state(repo_owner: str, repo_name: str, repo_path: str = "") -> List[Dict[str, Any]]:
+    """
+    Load the batches submitted for a repository path and not yet collected
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        repo_path: Path within the repository
+        
+    Returns:
+        Each batch's "id", "model" and the "custom_ids" of its requests
+    """
+    try:
+        with open(_batch_state_path(repo_owner, repo_name, repo_path), "r", encoding="utf-8") as f:
+            return json.load(f)["batches"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+def save_batch_state(repo_owner: str, repo_name: str, repo_path: str, batches: List[Dict[str, Any]]) -> None:
+    """
+    Remember the batches submitted for a repository path
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        repo_path: Path within the repository
+        batches: Each batch's "id", "model" and "custom_ids"
+    """
+    write_json_atomically(_batch_state_path(repo_owner, repo_name, repo_path), {"batches": batches})
+
+def clear_batch_state(repo_owner: str, repo_name: str, repo_path: str = "") -> None:
+    """Forget the batches of a repository path once their results are collected"""
+    try:
+        os.remove(_batch_state_path(repo_owner, repo_name, repo_path))
+    except OSError:
+        pass
+
+def get_batch_client() -> openai.OpenAI:
+    """Get an OpenAI client for the Batch and Files APIs"""
+    return openai.OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL or None)
+
+def build_batch_request(messages: List[BaseMessage], model: str) -> Dict[str, Any]:
+    """
+    Turn chat messages into one line of a batch input file
+    
+    The custom ID is a hash of the request body, so identical files share a
+    request and a resubmitted file maps onto the result of the earlier batch.
+    
+    Args:
+        messages: Chat messages analyze_code would send
+        model: OpenAI model name
+        
+    Returns:
+        The batch request
+    """
+    body = {
+        "model": model,
+        "messages": [
+            {"role": "system" if isinstance(message, SystemMessage) else "user", "content": message.content}
+            for message in messages
+        ],
+        "temperature": OPENAI_TEMPERATURE,
+        "max_tokens": OPENAI_MAX_TOKENS
+    }
+    custom_id = hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()[:40]
+    return {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+
+def submit_batch(client: openai.OpenAI, requests: List[Dict[str, Any]], path: str) -> str:
+    """
+    Write requests to a JSONL batch input file, upload it and start the batch
+    
+    Args:
+        client: OpenAI client
+        requests: Batch requests, all for the same model
+        path: Where to write the input file
+        
+    Returns:
+        The batch ID
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request) + "\n")
+    
+    with open(path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW
+    )
+    return batch.id
+
+def wait_for_batch(client: openai.OpenAI, batch_id: str, poll_seconds: float = BATCH_POLL_SECONDS) -> Any:
+    """
+    Poll a batch until it completes, fails, expires or is cancelled
+    
+    Args:
+        client: OpenAI client
+        batch_id: Batch ID
+        poll_seconds: Seconds between status checks
+        
+    Returns:
+        The final batch object
+    """
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in BATCH_FINAL_STATUSES:
+            return batch
+        time.sleep(poll_seconds)
+
+def read_batch_results(client: openai.OpenAI, batch: Any) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """
+    Read the successful responses of a finished batch
+    
+    Expired and cancelled batches still deliver the requests that completed
+    in time.
+    
+    Args:
+        client: OpenAI client
+        batch: Final batch object
+        
+    Returns:
+        Reply content and token usage, by custom ID
+    """
+    if not batch.output_file_id:
+        return {}
+    
+    results = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        response = result.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        body = response["body"]
+        results[result["custom_id"]] = (body["choices"][0]["message"]["content"], body.get("usage") or {})
+    return results
+
+def run_batch(
+    files: List[Tuple[str, str]],
+    repo_owner: str,
+    repo_name: str,
+    repo_path: str = "",
+    poll_seconds: float = BATCH_POLL_SECONDS,
+    client: Optional[openai.OpenAI] = None,
+    paths: Optional[List[str]] = None
+) -> Tuple[List[Optional[str]], Dict[str, Any]]:
+    """
+    Document files through the OpenAI Batch API
+    
+    Every file analyze_code would document with a single request is written
+    to a JSONL batch input file, one batch per routed model, and the batches
+    are polled until they finish. Results are also stored in the
+    documentation cache. Submitted batches are remembered until their
+    results are collected, so a restarted run waits for them instead of
+    submitting again.
+    
+    Args:
+        files: (code, filename) pairs to document
+        repo_owner: Repository owner
+        repo_name: Repository name
+        repo_path: Path within the repository
+        poll_seconds: Seconds between status checks
+        client: OpenAI client, by default one for OPENAI_BASE_URL
+        paths: Repository path of each file, used for routing; defaults to
+            the file names
+            
+    Returns:
+        Documentation per file, None for files left to analyze_code (cached,
+        chunked or failed), and statistics on the batches, requests and
+        token usage
+    """
+    client = client or get_batch_client()
+    
+    # Collect one request per distinct prompt, grouped by model
+    pending = {}
+    requests_by_model = {}
+    for index, ((code, filename), route) in enumerate(zip(files, route_files(files, paths))):
+        model = route["model"]
+        if is_documentation_cached(code, filename, model):
+            continue
+        messages = build_file_messages(code, filename)
+        if messages is None:
+            continue
+        request = build_batch_request(messages, model)
+        pending.setdefault(request["custom_id"], []).append(index)
+        requests_by_model.setdefault(model, {})[request["custom_id"]] = request
+    
+    batches = load_batch_state(repo_owner, repo_name, repo_path)
+    stats = {"batches": len(batches), "resumed_batches": len(batches), "requests": len(pending), "succeeded": 0, "failed": 0}
+    submitted = {custom_id for batch in batches for custom_id in batch["custom_ids"]}
+    
+    # Submit what no earlier batch covers; remember each batch as soon as it exists
+    for model, requests in requests_by_model.items():
+        requests = [request for custom_id, request in requests.items() if custom_id not in submitted]
+        if not requests:
+            continue
+        input_path = repository_state_path(
+            os.path.join(BATCH_STATE_DIR, "input"), repo_owner, repo_name, repo_path, f"__{len(batches)}.jsonl"
+        )
+        batch_id = submit_batch(client, requests, input_path)
+        batches.append({"id": batch_id, "model": model, "custom_ids": [request["custom_id"] for request in requests]})
+        save_batch_state(repo_owner, repo_name, repo_path, batches)
+        stats["batches"] += 1
+        print(f"Submitted batch {batch_id} with {len(requests)} requests to {model}")
+    
+    # Results of batches resumed from a previous run may include files no longer selected
+    documentation = [None] * len(files)
+    usage = {"prompt_tokens": 0, "completion_tokens": 0}
+    for saved in batches:
+        batch = wait_for_batch(client, saved["id"], poll_seconds)
+        if batch.status != "completed":
+            print(f"Batch {saved['id']} ended {batch.status}; its missing files are analyzed directly")
+        
+        for custom_id, (content, token_usage) in read_batch_results(client, batch).items():
+            if custom_id not in pending:
+                continue
+            for index in pending.pop(custom_id):
+                code, filename = files[index]
+                documentation[index] = content
+                cache_documentation(code, filename, content, saved["model"])
+            stats["succeeded"] += 1
+            for name in usage:
+                usage[name] += token_usage.get(name, 0)
+    
+    clear_batch_state(repo_owner, repo_name, repo_path)
+    stats["failed"] = len(pending)
+    return documentation, {**stats, **usage}
\ No newline at end of file
@@ -1,30 +1,297 @@
+import asyncio
 import os
-from typing import Dict, Any, List, Optional
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import openai
 from langchain.chat_models import ChatOpenAI
-from langchain.schema import AIMessage, HumanMessage, SystemMessage
+from langchain.schema import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
 from dotenv import load_dotenv
 
+from src.doc_cache import documentation_cache_key, get_documentation_cache
+from src.hedging import get_hedge_tracker
+from src.model_router import compute_fan_in, route_file
+from src.prompts import (
+    CHUNK_HUMAN_PROMPT,
+    CHUNK_SYSTEM_PROMPT,
+    FILE_HUMAN_PROMPT,
+    FILE_SYSTEM_PROMPT,
+    PACK_FILE_PROMPT,
+    PACK_HUMAN_PROMPT,
+    PACK_SYSTEM_PROMPT,
+    PROMPT_VERSION,
+    README_HUMAN_PROMPT,
+    README_SYSTEM_PROMPT,
+    REDUCE_HUMAN_PROMPT,
+    STRUCTURE_HUMAN_PROMPT,
+    STRUCTURE_SYSTEM_PROMPT,
+    STRUCTURED_HUMAN_PROMPT,
+    STRUCTURED_SYSTEM_PROMPT,
+    UPDATE_HUMAN_PROMPT
+)
+from src.python_skeleton import build_python_skeleton
+from src.structured_docs import FileDocReply, SymbolDoc, extract_python_symbols, module_outline, parse_reply, render_markdown
+from src.rate_limiter import OPENAI_MAX_RETRIES, get_rate_limiter, openai_backoff_delay, openai_retry_after
+from src.tokens import estimate_message_tokens, estimate_tokens
+
 # Load environment variables from .env
 load_dotenv()
 
 # Get OpenAI API key from environment variables
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
+OPENAI_TEMPERATURE = 0
+
+# Completion token limit, also reserved against the tokens-per-minute budget
+OPENAI_MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "2000"))
+
+# Maximum number of LLM requests in flight at once
+OPENAI_MAX_IN_FLIGHT = int(os.getenv("OPENAI_MAX_IN_FLIGHT", "8"))
+
+# Files above the threshold are documented chunk by chunk, then merged
+CHUNK_THRESHOLD_TOKENS = int(os.getenv("CHUNK_THRESHOLD_TOKENS", "6000"))
+CHUNK_SIZE_TOKENS = int(os.getenv("CHUNK_SIZE_TOKENS", "3000"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "0"))
+
+# Splitters that cut on syntactic boundaries, by language name
+SPLITTER_LANGUAGES = {
+    'Python': Language.PYTHON,
+    'JavaScript': Language.JS,
+    'TypeScript': Language.TS,
+    'React JSX': Language.JS,
+    'React TSX': Language.TS,
+    'Java': Language.JAVA,
+    'C': Language.C,
+    'C++': Language.CPP,
+    'C#': Language.CSHARP,
+    'Go': Language.GO,
+    'Ruby': Language.RUBY,
+    'PHP': Language.PHP,
+    'Swift': Language.SWIFT,
+    'Kotlin': Language.KOTLIN,
+    'Rust': Language.RUST,
+    'Scala': Language.SCALA,
+    'Lua': Language.LUA,
+    'Perl': Language.PERL,
+    'Haskell': Language.HASKELL,
+    'Elixir': Language.ELIXIR,
+    'Markdown': Language.MARKDOWN,
+    'HTML': Language.HTML
+}
+
+# Files up to PACK_MAX_FILE_LINES lines are packed together into one request,
+# up to PACK_BUDGET_TOKENS of code and PACK_MAX_FILES files per request
+PACK_MAX_FILE_LINES = int(os.getenv("PACK_MAX_FILE_LINES", "50"))
+PACK_BUDGET_TOKENS = int(os.getenv("PACK_BUDGET_TOKENS", "3000"))
+PACK_MAX_FILES = int(os.getenv("PACK_MAX_FILES", "6"))
+PACK_TOKENS_PER_FILE = int(os.getenv("PACK_TOKENS_PER_FILE", "700"))
+
+PACK_DELIMITER = re.compile(r"^<<<FILE (\d+)>>>[ \t]*$", re.MULTILINE)
+
+# Structured mode: Python files are documented symbol by symbol as validated JSON,
+# cached per symbol and rendered to Markdown locally
+STRUCTURED_DOCS = os.getenv("STRUCTURED_DOCS", "False").lower() in ("true", "1", "t")
+
+# Update mode: a changed file with previous documentation is sent as a diff, and
+# only the affected sections are regenerated, unless the diff is larger than
+# UPDATE_MAX_DIFF_RATIO of the file or the file is too small to benefit
+UPDATE_MAX_DIFF_RATIO = float(os.getenv("UPDATE_MAX_DIFF_RATIO", "0.2"))
+UPDATE_MIN_FILE_TOKENS = int(os.getenv("UPDATE_MIN_FILE_TOKENS", "1000"))
+UPDATE_CONTEXT_LINES = int(os.getenv("UPDATE_CONTEXT_LINES", "20"))
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@", re.MULTILINE)
+SECTION_HEADING = re.compile(r"^#{1,3} \S")
+
+# Prompt compression settings: longer string literals and runs of data-only
+# lines are collapsed to a placeholder
+LITERAL_MAX_CHARS = int(os.getenv("LITERAL_MAX_CHARS", "200"))
+DATA_BLOCK_MAX_LINES = int(os.getenv("DATA_BLOCK_MAX_LINES", "12"))
+
+# Line comment prefix of each language prompt compression understands
+COMMENT_PREFIXES = {
+    'Python': '#', 'Ruby': '#', 'Shell': '#', 'Perl': '#', 'R': '#', 'Elixir': '#', 'Julia': '#',
+    'JavaScript': '//', 'TypeScript': '//', 'React JSX': '//', 'React TSX': '//', 'Java': '//',
+    'C': '//', 'C++': '//', 'C#': '//', 'Go': '//', 'PHP': '//', 'Swift': '//', 'Kotlin': '//',
+    'Rust': '//', 'Scala': '//', 'Dart': '//',
+    'Lua': '--', 'SQL': '--', 'Haskell': '--', 'Elm': '--'
+}
 
-# Initialize ChatOpenAI with the API key
+LICENSE_MARKERS = re.compile(
+    r"copyright|licen[cs]ed?\b|spdx-license-identifier|all rights reserved|permission is hereby granted",
+    re.IGNORECASE
+)
+STRING_LITERAL = re.compile(r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'')
+DATA_LINE = re.compile(
+    r"^[\s,;:\[\]{}()]*(?:(?:STRING|0[xX][0-9a-fA-F]+|[-+]?\d[\d_.]*(?:[eE][-+]?\d+)?"
+    r"|true|false|null|nil|None|True|False)[\s,;:\[\]{}()]*)+$"
+)
+
+# Initialize ChatOpenAI with the API key; retries go through the shared rate limiter
 llm = ChatOpenAI(
     model=OPENAI_MODEL,
-    temperature=0,
+    temperature=OPENAI_TEMPERATURE,
+    max_tokens=OPENAI_MAX_TOKENS,
+    max_retries=0,
     openai_api_key=OPENAI_API_KEY
 )
 
-def analyze_code(code: str, filename: str) -> str:
+# Clients of the models files are routed to, by model name
+_llm_clients = {OPENAI_MODEL: llm}
+_llm_clients_lock = threading.Lock()
+
+_usage_lock = threading.Lock()
+
+def get_llm(model: str = OPENAI_MODEL) -> ChatOpenAI:
+    """Get the shared client of a model, creating it with the default settings on first use"""
+    with _llm_clients_lock:
+        if model not in _llm_clients:
+            _llm_clients[model] = ChatOpenAI(
+                model=model,
+                temperature=OPENAI_TEMPERATURE,
+                max_tokens=OPENAI_MAX_TOKENS,
+                max_retries=0,
+                openai_api_key=OPENAI_API_KEY
+            )
+        return _llm_clients[model]
+
+def _record_usage(usage: Optional[Dict[str, Any]], token_usage: Dict[str, Any]) -> None:
+    """Add the token usage reported for one call, including prompt cache hits, to a statistics dictionary"""
+    if usage is None:
+        return
+    details = token_usage.get("prompt_tokens_details") or {}
+    with _usage_lock:
+        usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + token_usage.get("prompt_tokens", 0)
+        usage["cached_tokens"] = usage.get("cached_tokens", 0) + (details.get("cached_tokens") or 0)
+        usage["completion_tokens"] = usage.get("completion_tokens", 0) + token_usage.get("completion_tokens", 0)
+
+def _call_llm(
+    messages: List[BaseMessage],
+    max_tokens: int = OPENAI_MAX_TOKENS,
+    usage: Optional[Dict[str, Any]] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    model: str = OPENAI_MODEL
+) -> str:
+    """
+    Send chat messages to the LLM within the account's rate limits
+    
+    Each call reserves its estimated prompt size plus the completion limit
+    against the tokens-per-minute budget, then settles the reservation with
+    the reported usage. Rate limited and transient failures are retried,
+    honouring the server's retry hints. With on_token the reply is streamed;
+    streamed replies report no usage, so they are settled and recorded with
+    an estimate and are only retried when they fail before the first token.
+    With HEDGING_ENABLED, a call that outlives the model's recent latency
+    percentile gets a duplicate request, which makes its own reservation;
+    whichever of the two loses is cancelled.
+    
+    Args:
+        messages: Chat messages to send
+        max_tokens: Completion token limit of this call
+        usage: Optional dictionary that accumulates prompt, cached and
+            completion token counts
+        on_token: Optional callback receiving each piece of the reply as it
+            is generated
+        model: OpenAI model to send the messages to
+        
+    Returns:
+        The content of the model's reply
+    """
+    client = get_llm(model)
+    limiter = get_rate_limiter()
+    estimated_tokens = estimate_message_tokens(messages) + max_tokens
+    
+    async def generate() -> Any:
+        return await client.agenerate([messages], max_tokens=max_tokens)
+    
+    async def hedge() -> Any:
+        # Waiting for the rate limiter must not hold up the shared event loop
+        hedge_reservation = await asyncio.to_thread(limiter.acquire, estimated_tokens)
+        try:
+            result = await generate()
+        except BaseException:
+            limiter.settle(hedge_reservation, estimated_tokens)
+            raise
+        limiter.settle(hedge_reservation, (result.llm_output or {}).get("token_usage", {}).get("total_tokens", estimated_tokens))
+        return result
+    
+    attempt = 0
+    while True:
+        reservation = limiter.acquire(estimated_tokens)
+        streamed = []
+        try:
+            if on_token is None:
+                result = get_hedge_tracker().call(model, generate, hedge)
+            else:
+                for chunk in client.stream(messages, max_tokens=max_tokens):
+                    streamed.append(chunk.content)
+                    on_token(chunk.content)
+        except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+            # Tokens already handed to on_token cannot be taken back
+            if attempt >= OPENAI_MAX_RETRIES or streamed:
+                raise
+            headers = e.response.headers if isinstance(e, openai.APIStatusError) else {}
+            delay = openai_backoff_delay(attempt, openai_retry_after(headers))
+            if isinstance(e, openai.RateLimitError):
+                # Hold back every worker, not just this one
+                limiter.pause(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+            continue
+        
+        if on_token is not None:
+            text = "".join(streamed)
+            prompt_tokens = estimated_tokens - max_tokens
+            completion_tokens = estimate_tokens(text)
+            limiter.settle(reservation, prompt_tokens + completion_tokens)
+            _record_usage(usage, {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens})
+            return text
+        
+        token_usage = (result.llm_output or {}).get("token_usage", {})
+        limiter.settle(reservation, token_usage.get("total_tokens", estimated_tokens))
+        _record_usage(usage, token_usage)
+        return result.generations[0][0].text
+
+def _file_cache_key(code: str, language: str, model: str = OPENAI_MODEL) -> str:
+    """Get the documentation cache key of a whole file"""
+    return documentation_cache_key(f"{language}\0{code}", PROMPT_VERSION, model, OPENAI_TEMPERATURE)
+
+def analyze_code(
+    code: str,
+    filename: str,
+    stats: Optional[Dict[str, Any]] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    model: Optional[str] = None,
+    previous_documentation: Optional[str] = None,
+    patch: Optional[str] = None
+) -> str:
     """
     Analyze code and generate documentation
     
+    Documentation is served from the documentation cache when the same code
+    was already analyzed with the same prompt version, model and temperature.
+    With STRUCTURED_DOCS, Python files are documented symbol by symbol and
+    only changed symbols are sent. Given the documentation of the previous
+    version and the diff from it, only the affected sections are revised.
+    Otherwise, files larger than CHUNK_THRESHOLD_TOKENS are split on
+    syntactic boundaries; the chunks are analyzed concurrently and cached
+    individually, and a final call merges their notes. Code is compressed
+    before it is sent, and Python files over SKELETON_BUDGET_TOKENS are then
+    reduced to a skeleton with the longest function bodies elided.
+    
     Args:
         code: Source code to analyze
         filename: Name of the file
+        stats: Optional dictionary that receives per-call statistics
+        on_token: Optional callback receiving the documentation piece by piece
+            while it is generated; cached documentation is not streamed
+        model: OpenAI model to use; by default the model router picks one
+            from the file's size and complexity
+        previous_documentation: Documentation of the previous version of the file
+        patch: Unified diff from the previous version, as reported by GitHub
         
     Returns:
         Generated documentation in Markdown format
@@ -33,63 +300,734 @@ def analyze_code(code: str, filename: str) -> str:
     _, ext = os.path.splitext(filename)
     language = get_language_from_extension(ext)
     
-    # Create a system prompt that guides the AI to generate comprehensive documentation
-    system_prompt = f"""You are a technical documentation expert specializing in {language} code analysis.
+    route = {"route": "custom", "model": model} if model else route_file(code, language)
+    model = route["model"]
+    
+    cache = get_documentation_cache()
+    cache_key = _file_cache_key(code, language, model)
+    cached = cache.get(cache_key) if cache else None
+    if stats is not None:
+        stats["cache_hit"] = cached is not None
+        stats.setdefault("route", route["route"])
+        stats["model"] = model
+    if cached is not None:
+        return retitle_documentation(cached, filename)
+    
+    if STRUCTURED_DOCS and language == "Python":
+        documentation = _analyze_structured(code, filename, stats, model)
+        if documentation is not None:
+            if on_token:
+                on_token(documentation)
+            if cache:
+                cache.put(cache_key, documentation, PROMPT_VERSION, model)
+            return documentation
+    
+    if previous_documentation and patch and _update_applies(code, patch):
+        documentation = _update_documentation(code, filename, language, previous_documentation, patch, stats, model)
+        if documentation is not None:
+            if on_token:
+                on_token(documentation)
+            if cache:
+                cache.put(cache_key, documentation, PROMPT_VERSION, model)
+            return documentation
+    
+    prompt_code, code_note, elided = prepare_prompt_code(code, language)
+    if stats is not None:
+        if language == "Python":
+            stats["elided_functions"] = elided
+        stats["tokens_saved"] = estimate_tokens(code) - estimate_tokens(prompt_code)
+    
+    if estimate_tokens(prompt_code) > CHUNK_THRESHOLD_TOKENS:
+        # Too large for a single prompt: document each chunk, then merge the notes
+        chunks = split_code(prompt_code, language)
+        if stats is not None:
+            stats["chunks"] = len(chunks)
+        notes = _analyze_chunks(chunks, language, stats, model)
+        documentation = _reduce_chunk_notes(notes, filename, language, stats, on_token, model)
+    else:
+        # Call the LLM to generate documentation
+        messages = _file_messages(prompt_code, code_note, filename, language)
+        documentation = _call_llm(messages, usage=stats, on_token=on_token, model=model)
+    
+    if cache:
+        cache.put(cache_key, documentation, PROMPT_VERSION, model)
+    
+    return documentation
+
+def _file_messages(prompt_code: str, code_note: str, filename: str, language: str) -> List[BaseMessage]:
+    """Build the messages that ask for the documentation of a whole file"""
+    return [
+        SystemMessage(content=FILE_SYSTEM_PROMPT),
+        HumanMessage(content=FILE_HUMAN_PROMPT.format(language=language, filename=filename, code=prompt_code, code_note=code_note))
+    ]
+
+def build_file_messages(code: str, filename: str) -> Optional[List[BaseMessage]]:
+    """
+    Build the single request analyze_code sends for a file
+    
+    Args:
+        code: Source code
+        filename: Name of the file
+        
+    Returns:
+        The chat messages, or None for files large enough to be analyzed
+        chunk by chunk
+    """
+    language = get_language_from_extension(os.path.splitext(filename)[1])
+    prompt_code, code_note, _ = prepare_prompt_code(code, language)
+    if estimate_tokens(prompt_code) > CHUNK_THRESHOLD_TOKENS:
+        return None
+    return _file_messages(prompt_code, code_note, filename, language)
+
+def cache_documentation(code: str, filename: str, documentation: str, model: str) -> None:
+    """
+    Store documentation generated outside analyze_code, so analyze_code serves it
     
-    Analyze the provided code and create comprehensive documentation that includes:
-    1. A high-level overview of what the file does
-    2. A detailed breakdown of each function/class/component
-    3. Parameters, return values, and their types
-    4. Dependencies and their purposes
-    5. Any important implementation details or design patterns
-    6. How this file fits into the overall project architecture
+    Args:
+        code: Source code
+        filename: Name of the file
+        documentation: Documentation generated for the file
+        model: OpenAI model that generated it
+    """
+    cache = get_documentation_cache()
+    if cache:
+        language = get_language_from_extension(os.path.splitext(filename)[1])
+        cache.put(_file_cache_key(code, language, model), documentation, PROMPT_VERSION, model)
+
+def prepare_prompt_code(code: str, language: str) -> Tuple[str, str, int]:
+    """
+    Shrink code to what is sent to the LLM for a single file
     
-    Format the documentation in Markdown with appropriate headings, code blocks, and sections.
-    Use the following structure:
+    Args:
+        code: Source code
+        language: Language name
+        
+    Returns:
+        The code to send, a note for the prompt explaining any elisions, and
+        the number of elided function bodies
+    """
+    # Drop license headers, bulky literals and redundant whitespace
+    prompt_code = compress_code(code, language)
     
-    # File: [filename]
+    # Python modules are reduced to their structure when over the prompt budget
+    elided = 0
+    if language == "Python":
+        prompt_code, elided = build_python_skeleton(prompt_code)
+    code_note = "\n\nLong function bodies are elided; signatures, type hints and docstrings are complete." if elided else ""
+    return prompt_code, code_note, elided
+
+def is_documentation_cached(code: str, filename: str, model: Optional[str] = None) -> bool:
+    """
+    Check whether documentation for this code is already in the documentation cache
     
-    ## Overview
-    [Brief description of the file's purpose]
+    Args:
+        code: Source code
+        filename: Name of the file
+        model: OpenAI model the file is documented with; by default the one
+            the model router picks
+            
+    Returns:
+        True if analyze_code would not call the LLM
+    """
+    cache = get_documentation_cache()
+    language = get_language_from_extension(os.path.splitext(filename)[1])
+    model = model or route_file(code, language)["model"]
+    return bool(cache) and cache.get(_file_cache_key(code, language, model)) is not None
+
+def _strip_license_header(lines: List[str], prefix: str) -> List[str]:
+    """Replace a license comment at the top of a file with a one-line note"""
+    start = 0
+    if lines and lines[0].startswith("#!"):
+        start = 1
+    while start < len(lines) and not lines[start].strip():
+        start += 1
     
-    ## Dependencies
-    [List of imports/dependencies and their purposes]
+    end = start
+    if prefix == "//" and start < len(lines) and lines[start].lstrip().startswith("/*"):
+        while end < len(lines) and "*/" not in lines[end]:
+            end += 1
+        end += 1
+    else:
+        while end < len(lines) and lines[end].lstrip().startswith(prefix):
+            end += 1
     
-    ## Components
+    header = "\n".join(lines[start:end])
+    if end <= start or not LICENSE_MARKERS.search(header):
+        return lines
+    return lines[:start] + [f"{prefix} License header removed ({end - start} lines)"] + lines[end:]
+
+def _collapse_literal(match: re.Match) -> str:
+    """Replace a long string literal with a placeholder noting its size"""
+    literal = match.group(0)
+    if len(literal) - 2 <= LITERAL_MAX_CHARS:
+        return literal
+    quote = literal[0]
+    return f"{quote}<{len(literal) - 2} character literal>{quote}"
+
+def _collapse_data_blocks(lines: List[str], prefix: str) -> List[str]:
+    """Keep the first lines of each long run of data-only lines and elide the rest"""
+    result = []
+    run = []
+    for line in lines + [None]:
+        if line is not None and line.strip() and DATA_LINE.match(STRING_LITERAL.sub("STRING", line)):
+            run.append(line)
+            continue
+        
+        if len(run) > DATA_BLOCK_MAX_LINES:
+            keep = run[:3]
+            indent = run[3][:len(run[3]) - len(run[3].lstrip())]
+            result.extend(keep + [f"{indent}{prefix} ... {len(run) - len(keep)} more data lines"])
+        else:
+            result.extend(run)
+        run = []
+        if line is not None:
+            result.append(line)
+    return result
+
+def compress_code(code: str, language: str) -> str:
+    """
+    Remove what does not help document a file before it is sent to the LLM
     
-    ### [Component Name]
-    [Description]
+    A leading license header is replaced by a one-line note, string literals
+    longer than LITERAL_MAX_CHARS and runs of more than DATA_BLOCK_MAX_LINES
+    data-only lines are collapsed to a placeholder with a size note, trailing
+    whitespace is stripped and runs of blank lines are squeezed to one.
+    Indentation is left alone, so compressed Python still parses.
     
-    #### Parameters
-    - `param1` (type): Description
-    - `param2` (type): Description
+    Args:
+        code: Source code
+        language: Language name, which decides the comment syntax
+        
+    Returns:
+        The compressed code; languages without a known comment syntax only
+        get their whitespace normalised
+    """
+    lines = [line.rstrip() for line in code.splitlines()]
     
-    #### Returns
-    - (type): Description
+    prefix = COMMENT_PREFIXES.get(language)
+    if prefix:
+        lines = _strip_license_header(lines, prefix)
+        lines = [STRING_LITERAL.sub(_collapse_literal, line) for line in lines]
+        lines = _collapse_data_blocks(lines, prefix)
     
-    #### Example Usage
-    ```{language}
-    [Example code showing how to use this component]
-    ```
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip("\n")
+
+def split_code(code: str, language: str) -> List[str]:
+    """
+    Split source code into chunks that fit the chunk token budget
     
-    ## Implementation Details
-    [Any important implementation details, algorithms, or design patterns]
+    Args:
+        code: Source code to split
+        language: Language name, used to split on class and function boundaries
+        
+    Returns:
+        Chunks of the source code, in file order
     """
+    settings = {
+        "chunk_size": CHUNK_SIZE_TOKENS,
+        "chunk_overlap": CHUNK_OVERLAP_TOKENS,
+        "length_function": estimate_tokens
+    }
+    if language in SPLITTER_LANGUAGES:
+        splitter = RecursiveCharacterTextSplitter.from_language(SPLITTER_LANGUAGES[language], **settings)
+    else:
+        splitter = RecursiveCharacterTextSplitter(**settings)
+    return splitter.split_text(code)
+
+def _analyze_chunk(
+    chunk: str,
+    language: str,
+    stats: Optional[Dict[str, Any]] = None,
+    model: str = OPENAI_MODEL
+) -> str:
+    """Document the components of one chunk, reusing cached notes for unchanged chunks"""
+    cache = get_documentation_cache()
+    cache_key = documentation_cache_key(f"{language}\0chunk\0{chunk}", PROMPT_VERSION, model, OPENAI_TEMPERATURE)
+    cached = cache.get(cache_key) if cache else None
+    if cached is not None:
+        return cached
     
-    # Create a human message that provides the code to analyze
-    human_prompt = f"File: {filename}\n\nCode:\n```{language}\n{code}\n```\n\nPlease generate comprehensive technical documentation for this file."
+    notes = _call_llm([
+        SystemMessage(content=CHUNK_SYSTEM_PROMPT),
+        HumanMessage(content=CHUNK_HUMAN_PROMPT.format(language=language, code=chunk))
+    ], usage=stats, model=model)
     
-    # Call the LLM to generate documentation
-    messages = [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=human_prompt)
-    ]
+    if cache:
+        cache.put(cache_key, notes, PROMPT_VERSION, model)
+    return notes
+
+def _analyze_chunks(
+    chunks: List[str],
+    language: str,
+    stats: Optional[Dict[str, Any]] = None,
+    model: str = OPENAI_MODEL
+) -> List[str]:
+    """Document chunks concurrently, keeping file order"""
+    with ThreadPoolExecutor(max_workers=min(OPENAI_MAX_IN_FLIGHT, len(chunks))) as executor:
+        return list(executor.map(lambda chunk: _analyze_chunk(chunk, language, stats, model), chunks))
+
+def _reduce_chunk_notes(
+    notes: List[str],
+    filename: str,
+    language: str,
+    stats: Optional[Dict[str, Any]] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    model: str = OPENAI_MODEL
+) -> str:
+    """Merge the notes of all chunks into documentation following the file template"""
+    sections = "\n\n".join(f"### Part {index + 1} of {len(notes)}\n{part}" for index, part in enumerate(notes))
     
-    response = llm(messages)
-    documentation = response.content
+    return _call_llm([
+        SystemMessage(content=FILE_SYSTEM_PROMPT),
+        HumanMessage(content=REDUCE_HUMAN_PROMPT.format(language=language, filename=filename, sections=sections))
+    ], usage=stats, on_token=on_token, model=model)
+
+def _update_applies(code: str, patch: str) -> bool:
+    """Decide whether revising documentation from a diff is worth it over regenerating it"""
+    code_tokens = estimate_tokens(code)
+    return code_tokens >= UPDATE_MIN_FILE_TOKENS and estimate_tokens(patch) <= UPDATE_MAX_DIFF_RATIO * code_tokens
+
+def _diff_context(code: str, patch: str, context_lines: int = UPDATE_CONTEXT_LINES) -> str:
+    """Excerpt the current code around every hunk of a diff, merging overlapping excerpts"""
+    lines = code.splitlines()
+    ranges = []
+    for match in HUNK_HEADER.finditer(patch):
+        start = int(match.group(1))
+        length = int(match.group(2)) if match.group(2) is not None else 1
+        first = max(start - context_lines, 1)
+        last = min(start + length - 1 + context_lines, len(lines))
+        if ranges and first <= ranges[-1][1] + 1:
+            ranges[-1][1] = max(ranges[-1][1], last)
+        else:
+            ranges.append([first, last])
+    return "\n...\n".join("\n".join(lines[first - 1:last]) for first, last in ranges)
+
+def _split_sections(documentation: str) -> List[List[str]]:
+    """Split Markdown into [heading, body] sections at #, ## and ### headings outside code blocks"""
+    sections = [["", ""]]
+    in_code = False
+    for line in documentation.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        if not in_code and SECTION_HEADING.match(line):
+            sections.append([line.strip(), ""])
+        else:
+            sections[-1][1] += line
+    return sections
+
+def _merge_sections(documentation: str, revision: str) -> Optional[str]:
+    """
+    Apply revised sections to documentation
     
+    Sections are matched by their heading line. Revised sections replace
+    existing ones, sections revised to REMOVED are dropped, and new ###
+    sections are added at the end of the components.
+    
+    Args:
+        documentation: Existing documentation
+        revision: The model's reply listing the changed sections
+        
+    Returns:
+        The merged documentation, or None if the reply has no sections
+    """
+    if revision.strip() == "NO CHANGES":
+        return documentation
+    
+    revised = [section for section in _split_sections(revision.strip()) if section[0]]
+    if not revised:
+        return None
+    
+    sections = _split_sections(documentation.rstrip("\n") + "\n")
+    headings = [heading for heading, _ in sections]
+    for heading, body in revised:
+        body = body.strip("\n") + "\n\n"
+        if heading in headings:
+            index = headings.index(heading)
+            if body.strip() == "REMOVED":
+                del sections[index]
+                del headings[index]
+            else:
+                sections[index][1] = body
+            continue
+        if body.strip() == "REMOVED":
+            continue
+        
+        # New components go after the last component; anything else goes at the end
+        index = len(sections)
+        if heading.startswith("### "):
+            components = [position for position, existing in enumerate(headings) if existing.startswith("### ")]
+            if components:
+                index = components[-1] + 1
+        sections.insert(index, [heading, body])
+        headings.insert(index, heading)
+    
+    return "".join(f"{heading}\n{body}" if heading else body for heading, body in sections).rstrip("\n") + "\n"
+
+def _update_documentation(
+    code: str,
+    filename: str,
+    language: str,
+    previous_documentation: str,
+    patch: str,
+    stats: Optional[Dict[str, Any]] = None,
+    model: str = OPENAI_MODEL
+) -> Optional[str]:
+    """
+    Revise the documentation of a previous version of a file for a diff
+    
+    Only the existing documentation, the diff and the current code around
+    each hunk are sent, and the model returns only the sections that
+    change, which are merged in locally.
+    
+    Args:
+        code: Current source code
+        filename: Name of the file
+        language: Language name
+        previous_documentation: Documentation of the previous version
+        patch: Unified diff from the previous version
+        stats: Optional dictionary that receives per-call statistics
+        model: OpenAI model to use
+        
+    Returns:
+        The revised documentation, or None if the reply cannot be merged
+    """
+    previous_documentation = retitle_documentation(previous_documentation, filename)
+    revision = _call_llm([
+        SystemMessage(content=FILE_SYSTEM_PROMPT),
+        HumanMessage(content=UPDATE_HUMAN_PROMPT.format(
+            language=language,
+            filename=filename,
+            documentation=previous_documentation,
+            patch=patch,
+            context=_diff_context(code, patch)
+        ))
+    ], usage=stats, model=model)
+    
+    documentation = _merge_sections(previous_documentation, revision)
+    if stats is not None:
+        stats["updated"] = documentation is not None
     return documentation
 
+def _structured_key(kind: str, content: str, model: str) -> str:
+    """Get the documentation cache key of a symbol or module outline in structured mode"""
+    return documentation_cache_key(f"Python\0{kind}\0{content}", PROMPT_VERSION, model, OPENAI_TEMPERATURE)
+
+def _request_structured(
+    filename: str,
+    outline: str,
+    sources: List[str],
+    with_overview: bool,
+    stats: Optional[Dict[str, Any]],
+    model: str
+) -> Optional[FileDocReply]:
+    """Ask for the structured documentation of some symbols, and of the module if needed"""
+    if sources and with_overview:
+        request = "Document every symbol above, and describe the module as a whole in overview, dependencies and implementation_details."
+    elif sources:
+        request = "Document every symbol above. Leave overview, dependencies and implementation_details empty."
+    else:
+        request = "Describe the module as a whole in overview, dependencies and implementation_details. Leave symbols empty."
+    
+    reply = _call_llm([
+        SystemMessage(content=STRUCTURED_SYSTEM_PROMPT),
+        HumanMessage(content=STRUCTURED_HUMAN_PROMPT.format(
+            language="Python", filename=filename, outline=outline, symbols="\n\n".join(sources) or "(none)", request=request
+        ))
+    ], usage=stats, model=model)
+    return parse_reply(reply)
+
+def _analyze_structured(
+    code: str,
+    filename: str,
+    stats: Optional[Dict[str, Any]] = None,
+    model: str = OPENAI_MODEL
+) -> Optional[str]:
+    """
+    Document a Python file symbol by symbol, reusing cached symbols
+    
+    Each top-level class and function is cached by the hash of its
+    (compressed) source, and the overview by the hash of the module outline,
+    so editing one function body costs one small request. Symbols to
+    document are sent in groups of up to CHUNK_SIZE_TOKENS.
+    
+    Args:
+        code: Python source code
+        filename: Name of the file
+        stats: Optional dictionary that receives per-call statistics
+        model: OpenAI model to use
+        
+    Returns:
+        Documentation rendered from the validated replies, or None when the
+        file has no symbols, cannot be parsed or a reply is invalid
+    """
+    prompt_code = compress_code(code, "Python")
+    symbols = extract_python_symbols(prompt_code)
+    if not symbols:
+        return None
+    outline = module_outline(prompt_code)
+    
+    cache = get_documentation_cache()
+    cached_overview = cache.get(_structured_key("overview", outline, model)) if cache else None
+    overview = FileDocReply.model_validate_json(cached_overview) if cached_overview else None
+    
+    symbol_docs = [None] * len(symbols)
+    groups = [[]]
+    group_tokens = 0
+    for index, symbol in enumerate(symbols):
+        cached = cache.get(_structured_key("symbol", symbol.source, model)) if cache else None
+        if cached:
+            symbol_docs[index] = SymbolDoc.model_validate_json(cached)
+            continue
+        tokens = estimate_tokens(symbol.source)
+        if groups[-1] and group_tokens + tokens > CHUNK_SIZE_TOKENS:
+            groups.append([])
+            group_tokens = 0
+        groups[-1].append(index)
+        group_tokens += tokens
+    
+    # The first request also describes the module if its outline changed
+    if not groups[0] and overview is not None:
+        groups = []
+    requests = [(group, position == 0 and overview is None) for position, group in enumerate(groups)]
+    with ThreadPoolExecutor(max_workers=max(min(OPENAI_MAX_IN_FLIGHT, len(requests)), 1)) as executor:
+        replies = list(executor.map(
+            lambda request: _request_structured(
+                filename, outline, [symbols[index].source for index in request[0]], request[1], stats, model
+            ),
+            requests
+        ))
+    
+    for (group, with_overview), reply in zip(requests, replies):
+        if reply is None:
+            return None
+        if with_overview:
+            overview = reply.model_copy(update={"symbols": []})
+            if cache:
+                cache.put(_structured_key("overview", outline, model), overview.model_dump_json(), PROMPT_VERSION, model)
+        
+        # Match entries to the requested symbols by name, in order
+        entries = list(reply.symbols)
+        for index in group:
+            entry = next((entry for entry in entries if entry.name == symbols[index].name), None)
+            if entry is None:
+                return None
+            entries.remove(entry)
+            symbol_docs[index] = entry
+            if cache:
+                cache.put(_structured_key("symbol", symbols[index].source, model), entry.model_dump_json(), PROMPT_VERSION, model)
+    
+    if stats is not None:
+        generated = sum(len(group) for group, _ in requests)
+        stats["symbols_generated"] = generated
+        stats["symbols_cached"] = len(symbols) - generated
+    return render_markdown(filename, "Python", overview, symbol_docs)
+
+def _pack_small_files(files: List[Tuple[str, str]], models: List[str]) -> List[List[int]]:
+    """
+    Group small files of the same language and model into packs that share one request
+    
+    Files already in the documentation cache are left out, so they are
+    served without a request, and so are Python files in structured mode.
+    Packs are filled first-fit, largest file first.
+    
+    Args:
+        files: (code, filename) pairs to analyze
+        models: Model each file is routed to
+        
+    Returns:
+        Indices into files for each pack of at least two files
+    """
+    cache = get_documentation_cache()
+    candidates = {}
+    for index, ((code, filename), model) in enumerate(zip(files, models)):
+        language = get_language_from_extension(os.path.splitext(filename)[1])
+        if len(code.splitlines()) > PACK_MAX_FILE_LINES:
+            continue
+        if STRUCTURED_DOCS and language == "Python":
+            continue
+        if cache and cache.get(_file_cache_key(code, language, model)) is not None:
+            continue
+        candidates.setdefault((language, model), []).append((estimate_tokens(compress_code(code, language)), index))
+    
+    packs = []
+    for sized in candidates.values():
+        language_packs = []
+        for tokens, index in sorted(sized, reverse=True):
+            for pack in language_packs:
+                if pack["tokens"] + tokens <= PACK_BUDGET_TOKENS and len(pack["files"]) < PACK_MAX_FILES:
+                    pack["tokens"] += tokens
+                    pack["files"].append(index)
+                    break
+            else:
+                language_packs.append({"tokens": tokens, "files": [index]})
+        packs.extend(sorted(pack["files"]) for pack in language_packs if len(pack["files"]) > 1)
+    return packs
+
+def _analyze_pack(
+    files: List[Tuple[str, str]],
+    stats: List[Dict[str, Any]],
+    model: str = OPENAI_MODEL
+) -> List[Optional[str]]:
+    """
+    Document several small files of one language in a single request
+    
+    The model answers with one section per file, each introduced by a
+    "<<<FILE n>>>" delimiter line. Sections are cached like single-file
+    documentation.
+    
+    Args:
+        files: (code, filename) pairs, all in the same language
+        stats: Per-file statistics dictionaries to fill in
+        model: OpenAI model all files are routed to
+        
+    Returns:
+        Documentation per file, None for files whose section could not be parsed
+    """
+    language = get_language_from_extension(os.path.splitext(files[0][1])[1])
+    
+    parts = []
+    for number, ((code, filename), file_stats) in enumerate(zip(files, stats), 1):
+        prompt_code = compress_code(code, language)
+        file_stats["tokens_saved"] = estimate_tokens(code) - estimate_tokens(prompt_code)
+        parts.append(PACK_FILE_PROMPT.format(number=number, filename=filename, language=language, code=prompt_code))
+    
+    # Token usage of the shared request is reported on the first file
+    response = _call_llm([
+        SystemMessage(content=PACK_SYSTEM_PROMPT),
+        HumanMessage(content=PACK_HUMAN_PROMPT.format(language=language, files="\n\n".join(parts)))
+    ], max_tokens=PACK_TOKENS_PER_FILE * len(files), usage=stats[0], model=model)
+    
+    # Split the response on the delimiters; text before the first one is dropped
+    sections = {}
+    pieces = PACK_DELIMITER.split(response)
+    for number, section in zip(pieces[1::2], pieces[2::2]):
+        section = section.strip()
+        if section.startswith("# File:"):
+            sections[int(number)] = section
+    
+    cache = get_documentation_cache()
+    results = []
+    for number, (code, filename) in enumerate(files, 1):
+        documentation = sections.get(number)
+        if documentation is not None:
+            documentation = retitle_documentation(documentation, filename)
+            if cache:
+                cache.put(_file_cache_key(code, language, model), documentation, PROMPT_VERSION, model)
+        results.append(documentation)
+    return results
+
+def route_files(files: List[Tuple[str, str]], paths: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Route each file of a run to the fast or the strong model
+    
+    Args:
+        files: (code, filename) pairs of one run
+        paths: Repository path of each file, which tells files with the same
+            name apart when counting imports; defaults to the file names
+            
+    Returns:
+        The route of each file, in input order
+    """
+    paths = paths or [filename for _, filename in files]
+    fan_in = compute_fan_in([(code, path) for (code, _), path in zip(files, paths)])
+    return [
+        route_file(code, get_language_from_extension(os.path.splitext(filename)[1]), fan_in[path])
+        for (code, filename), path in zip(files, paths)
+    ]
+
+def analyze_files(
+    files: List[Tuple[str, str]],
+    max_in_flight: int = OPENAI_MAX_IN_FLIGHT,
+    on_token: Optional[Callable[[int, str], None]] = None,
+    on_file: Optional[Callable[[int, str, Dict[str, Any]], None]] = None,
+    previous: Optional[List[Optional[Tuple[str, str]]]] = None,
+    paths: Optional[List[str]] = None
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Generate documentation for several files with requests running concurrently
+    
+    Each file is routed to the fast or the strong model by its size and
+    complexity, counting how many of the other files import it. Small files
+    routed to the same model are packed together so they share one request;
+    a file whose section of a packed response cannot be parsed is analyzed
+    on its own.
+    
+    Args:
+        files: (code, filename) pairs to analyze
+        max_in_flight: Maximum number of LLM requests in flight at once
+        on_token: Optional callback receiving (file index, piece of documentation)
+            as documentation of files analyzed on their own is generated
+        on_file: Optional callback receiving (file index, documentation, stats)
+            as soon as a file is done; called from worker threads
+        previous: Optional (previous documentation, diff) per file, for files
+            whose documentation can be revised rather than regenerated
+        paths: Repository path of each file, used for routing; defaults to
+            the file names
+            
+    Returns:
+        A (documentation, stats) pair per file, in input order
+    """
+    results = [None] * len(files)
+    
+    def finish(index: int, documentation: str, stats: Dict[str, Any]) -> None:
+        results[index] = (documentation, stats)
+        if on_file:
+            on_file(index, documentation, stats)
+    
+    def analyze(index: int) -> None:
+        stats = {"route": routes[index]["route"]}
+        code, filename = files[index]
+        started = time.monotonic()
+        stream = (lambda delta: on_token(index, delta)) if on_token else None
+        previous_documentation, patch = previous[index] if previous and previous[index] else (None, None)
+        documentation = analyze_code(code, filename, stats, stream, routes[index]["model"], previous_documentation, patch)
+        stats["seconds"] = time.monotonic() - started
+        finish(index, documentation, stats)
+    
+    def analyze_pack(pack: List[int]) -> None:
+        model = routes[pack[0]]["model"]
+        stats = [{"cache_hit": False, "packed": len(pack), "route": routes[index]["route"], "model": model} for index in pack]
+        started = time.monotonic()
+        sections = _analyze_pack([files[index] for index in pack], stats, model)
+        seconds = time.monotonic() - started
+        for index, documentation, file_stats in zip(pack, sections, stats):
+            if documentation is None:
+                analyze(index)
+            else:
+                file_stats["seconds"] = seconds
+                finish(index, documentation, file_stats)
+    
+    if not files:
+        return []
+    
+    routes = route_files(files, paths)
+    packs = _pack_small_files(files, [route["model"] for route in routes])
+    packed = {index for pack in packs for index in pack}
+    jobs = [(analyze_pack, pack) for pack in packs]
+    jobs += [(analyze, index) for index in range(len(files)) if index not in packed]
+    
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, len(jobs))) as executor:
+        futures = [executor.submit(job, argument) for job, argument in jobs]
+        for future in futures:
+            future.result()
+    return results
+
+def retitle_documentation(documentation: str, filename: str) -> str:
+    """
+    Point generated documentation at another file with identical content
+    
+    Args:
+        documentation: Documentation generated for a file
+        filename: Name of the file the documentation is reused for
+        
+    Returns:
+        The documentation with its "# File:" heading replaced
+    """
+    lines = documentation.split("\n", 1)
+    if lines[0].startswith("# File:"):
+        lines[0] = f"# File: {filename}"
+    return "\n".join(lines)
+
 def analyze_repository_structure(files: List[Dict[str, Any]]) -> str:
     """
     Analyze the structure of a repository and generate documentation
@@ -103,29 +1041,16 @@ def analyze_repository_structure(files: List[Dict[str, Any]]) -> str:
     # Create a file tree representation
     file_tree = "\n".join([file["path"] for file in files])
     
-    # Create a system prompt that guides the AI to analyze the repository structure
-    system_prompt = """You are a technical documentation expert specializing in software architecture.
-    
-    Analyze the provided repository structure and create comprehensive documentation that includes:
-    1. An overview of the project's architecture
-    2. Key components and their purposes
-    3. The relationships between components
-    4. Design patterns identified in the structure
-    
-    Format the documentation in Markdown with appropriate headings and sections.
-    """
-    
     # Create a human message that provides the repository structure
-    human_prompt = f"Repository Structure:\n\n```\n{file_tree}\n```\n\nPlease analyze this repository structure and generate documentation about the overall architecture."
+    human_prompt = STRUCTURE_HUMAN_PROMPT.format(file_tree=file_tree)
     
     # Call the LLM to generate documentation
     messages = [
-        SystemMessage(content=system_prompt),
+        SystemMessage(content=STRUCTURE_SYSTEM_PROMPT),
         HumanMessage(content=human_prompt)
     ]
     
-    response = llm(messages)
-    documentation = response.content
+    documentation = _call_llm(messages)
     
     return documentation
 
@@ -212,44 +1137,21 @@ def generate_readme(repository_name: str, files: List[Dict[str, Any]]) -> str:
         if language != "Unknown":
             languages.append(language)
     
-    main_languages = ", ".join(set(languages))
-    
-    # Create a system prompt for README generation
-    system_prompt = """You are a technical documentation expert specializing in creating README files.
-    
-    Generate a comprehensive README.md file for the repository that includes:
-    1. Project title and description
-    2. Key features
-    3. Tech stack (languages, frameworks, libraries)
-    4. Installation instructions
-    5. Usage examples
-    6. Project structure overview
-    7. Contributing guidelines
-    8. License information
-    
-    Format the documentation in Markdown with appropriate headings, code blocks, and sections.
-    """
+    main_languages = ", ".join(sorted(set(languages)))
     
     # Create a human message that provides repository information
-    human_prompt = f"""Repository Name: {repository_name}
-    
-    Main Languages: {main_languages}
-    
-    Repository Structure:
-    ```
-    {file_tree}
-    ```
-    
-    Please generate a comprehensive README.md file for this repository.
-    """
+    human_prompt = README_HUMAN_PROMPT.format(
+        repository_name=repository_name,
+        main_languages=main_languages,
+        file_tree=file_tree
+    )
     
     # Call the LLM to generate the README
     messages = [
-        SystemMessage(content=system_prompt),
+        SystemMessage(content=README_SYSTEM_PROMPT),
         HumanMessage(content=human_prompt)
     ]
     
-    response = llm(messages)
-    readme = response.content
+    readme = _call_llm(messages)
     
     return readme
\ No newline at end of file
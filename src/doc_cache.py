@@ -0,0 +1,199 @@
+import os
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Persistent cache of generated documentation
+DOC_CACHE_ENABLED = os.getenv("DOC_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+DOC_CACHE_PATH = os.getenv(
+    "DOC_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "documentation-generator", "documentation.sqlite")
+)
+DOC_CACHE_MAX_BYTES = int(os.getenv("DOC_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+def documentation_cache_key(content: str, prompt_version: str, model: str, temperature: float) -> str:
+    """
+    Build the cache key for documentation generated from some content
+    
+    Args:
+        content: Everything in the prompt that varies per file
+        prompt_version: Version of the prompt template
+        model: Model name
+        temperature: Sampling temperature
+        
+    Returns:
+        Hex-encoded SHA-256 cache key
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{prompt_version}\0{model}\0{temperature}\0".encode("utf-8"))
+    digest.update(content.encode("utf-8"))
+    return digest.hexdigest()
+
+class DocumentationCache:
+    """Size-bounded LRU store of documentation keyed by content, prompt and model"""
+    
+    def __init__(self, path: str, max_bytes: int):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS documentation (
+                key TEXT PRIMARY KEY,
+                prompt_version TEXT,
+                model TEXT,
+                documentation TEXT,
+                size INTEGER,
+                last_access REAL
+            )"""
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS documentation_lru ON documentation (last_access)")
+        self._connection.commit()
+        self._total_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM documentation").fetchone()[0]
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up cached documentation
+        
+        Args:
+            key: Key built with documentation_cache_key
+            
+        Returns:
+            The documentation, or None on a miss
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT documentation FROM documentation WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self._connection.execute(
+                "UPDATE documentation SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._connection.commit()
+            self.hits += 1
+            return row[0]
+    
+    def put(self, key: str, documentation: str, prompt_version: str, model: str) -> None:
+        """
+        Store generated documentation
+        
+        Args:
+            key: Key built with documentation_cache_key
+            documentation: Generated documentation
+            prompt_version: Version of the prompt template, kept for invalidation
+            model: Model name, kept for invalidation
+        """
+        size = len(documentation.encode("utf-8"))
+        with self._lock:
+            previous = self._connection.execute(
+                "SELECT size FROM documentation WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO documentation VALUES (?, ?, ?, ?, ?, ?)",
+                (key, prompt_version, model, documentation, size, time.time())
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            
+            while self._total_bytes > self.max_bytes:
+                row = self._connection.execute(
+                    "SELECT key, size FROM documentation ORDER BY last_access LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._connection.execute("DELETE FROM documentation WHERE key = ?", (row[0],))
+                self._total_bytes -= row[1]
+                self.evictions += 1
+            
+            self._connection.commit()
+    
+    def invalidate(self, model: Optional[str] = None, prompt_version: Optional[str] = None) -> int:
+        """
+        Remove cached documentation, optionally only for one model or prompt version
+        
+        Args:
+            model: Only remove entries generated by this model
+            prompt_version: Only remove entries generated with this prompt version
+            
+        Returns:
+            Number of entries removed
+        """
+        conditions = []
+        params = []
+        if model is not None:
+            conditions.append("model = ?")
+            params.append(model)
+        if prompt_version is not None:
+            conditions.append("prompt_version = ?")
+            params.append(prompt_version)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        with self._lock:
+            removed = self._connection.execute(f"DELETE FROM documentation{where}", params).rowcount
+            self._connection.commit()
+            self._total_bytes = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM documentation"
+            ).fetchone()[0]
+        return removed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current cache size"""
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM documentation").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self._total_bytes
+        }
+
+_cache: Optional[DocumentationCache] = None
+_cache_lock = threading.Lock()
+
+def get_documentation_cache() -> Optional[DocumentationCache]:
+    """Get the shared documentation cache, or None when caching is disabled"""
+    global _cache
+    
+    if not DOC_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DocumentationCache(DOC_CACHE_PATH, DOC_CACHE_MAX_BYTES)
+        return _cache
+
+def main():
+    """Inspect or invalidate the documentation cache from the command line"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Manage the documentation cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    invalidate_parser = subparsers.add_parser("invalidate", help="Remove cached documentation")
+    invalidate_parser.add_argument("--model", help="Only remove entries generated by this model")
+    invalidate_parser.add_argument("--prompt-version", help="Only remove entries generated with this prompt version")
+    subparsers.add_parser("stats", help="Show the number and size of cached entries")
+    args = parser.parse_args()
+    
+    cache = DocumentationCache(DOC_CACHE_PATH, DOC_CACHE_MAX_BYTES)
+    if args.command == "invalidate":
+        removed = cache.invalidate(model=args.model, prompt_version=args.prompt_version)
+        print(f"Removed {removed} cached documentation entries")
+    else:
+        stats = cache.stats()
+        print(f"Entries: {stats['entries']}")
+        print(f"Size: {stats['bytes']} bytes")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,236 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+from langchain.schema import HumanMessage, SystemMessage
+from dotenv import load_dotenv
+
+from src.code_analyzer import (
+    CHUNK_THRESHOLD_TOKENS,
+    OPENAI_MAX_IN_FLIGHT,
+    OPENAI_MAX_TOKENS,
+    OPENAI_MODEL,
+    get_language_from_extension,
+    is_documentation_cached,
+    prepare_prompt_code,
+    split_code
+)
+from src.file_selector import is_generated, is_minified
+from src.model_router import compute_fan_in, route_file
+from src.github_fetcher import GITHUB_WALK_WORKERS, get_file_content
+from src.prompts import (
+    CHUNK_HUMAN_PROMPT,
+    CHUNK_SYSTEM_PROMPT,
+    FILE_HUMAN_PROMPT,
+    FILE_SYSTEM_PROMPT,
+    REDUCE_HUMAN_PROMPT
+)
+from src.rate_limiter import OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT
+from src.tokens import count_message_tokens, count_tokens, estimate_tokens, get_encoding
+
+load_dotenv()
+
+# USD per 1,000 prompt and completion tokens; the longest matching prefix wins
+MODEL_PRICES = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-32k": (0.06, 0.12),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4.1": (0.002, 0.008),
+    "gpt-4.1-mini": (0.0004, 0.0016),
+    "gpt-3.5-turbo": (0.0005, 0.0015)
+}
+
+# Prices for models missing from the table, or to override it
+OPENAI_PROMPT_PRICE_PER_1K = os.getenv("OPENAI_PROMPT_PRICE_PER_1K")
+OPENAI_COMPLETION_PRICE_PER_1K = os.getenv("OPENAI_COMPLETION_PRICE_PER_1K")
+
+# Completion projection: a share of the code's tokens, within sensible bounds
+ESTIMATE_COMPLETION_RATIO = float(os.getenv("ESTIMATE_COMPLETION_RATIO", "0.6"))
+ESTIMATE_MIN_COMPLETION_TOKENS = int(os.getenv("ESTIMATE_MIN_COMPLETION_TOKENS", "300"))
+
+# Latency model of a single request
+ESTIMATE_TOKENS_PER_SECOND = float(os.getenv("ESTIMATE_TOKENS_PER_SECOND", "30"))
+ESTIMATE_REQUEST_OVERHEAD_SECONDS = float(os.getenv("ESTIMATE_REQUEST_OVERHEAD_SECONDS", "1.5"))
+
+# Number of most expensive files listed in an estimate
+ESTIMATE_TOP_FILES = 10
+
+def model_prices(model: str) -> Tuple[float, float]:
+    """
+    Get the price of a model's prompt and completion tokens
+    
+    Args:
+        model: OpenAI model name
+        
+    Returns:
+        USD per 1,000 prompt tokens and per 1,000 completion tokens
+    """
+    prefixes = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    prompt_price, completion_price = MODEL_PRICES[max(prefixes, key=len)] if prefixes else MODEL_PRICES["gpt-4"]
+    if OPENAI_PROMPT_PRICE_PER_1K:
+        prompt_price = float(OPENAI_PROMPT_PRICE_PER_1K)
+    if OPENAI_COMPLETION_PRICE_PER_1K:
+        completion_price = float(OPENAI_COMPLETION_PRICE_PER_1K)
+    return prompt_price, completion_price
+
+def _project_completion(code_tokens: int, max_tokens: int = OPENAI_MAX_TOKENS) -> int:
+    """Project the completion tokens a request about this much code produces"""
+    return min(max_tokens, max(ESTIMATE_MIN_COMPLETION_TOKENS, int(code_tokens * ESTIMATE_COMPLETION_RATIO)))
+
+def plan_file_requests(code: str, filename: str, model: str = OPENAI_MODEL) -> List[Tuple[int, int]]:
+    """
+    Work out the LLM requests analyze_code makes for a file
+    
+    Prompts are built exactly as analyze_code builds them and counted with
+    the model's tokenizer; completions are projected.
+    
+    Args:
+        code: Source code
+        filename: Name of the file
+        model: OpenAI model name
+        
+    Returns:
+        (prompt tokens, projected completion tokens) per request
+    """
+    language = get_language_from_extension(os.path.splitext(filename)[1])
+    prompt_code, code_note, _ = prepare_prompt_code(code, language)
+    
+    if estimate_tokens(prompt_code) <= CHUNK_THRESHOLD_TOKENS:
+        messages = [
+            SystemMessage(content=FILE_SYSTEM_PROMPT),
+            HumanMessage(content=FILE_HUMAN_PROMPT.format(language=language, filename=filename, code=prompt_code, code_note=code_note))
+        ]
+        return [(count_message_tokens(messages, model), _project_completion(count_tokens(prompt_code, model)))]
+    
+    # Chunked files: one request per chunk, then a reduce over the projected notes
+    requests = []
+    for chunk in split_code(prompt_code, language):
+        messages = [
+            SystemMessage(content=CHUNK_SYSTEM_PROMPT),
+            HumanMessage(content=CHUNK_HUMAN_PROMPT.format(language=language, code=chunk))
+        ]
+        requests.append((count_message_tokens(messages, model), _project_completion(count_tokens(chunk, model))))
+    
+    reduce_messages = [
+        SystemMessage(content=FILE_SYSTEM_PROMPT),
+        HumanMessage(content=REDUCE_HUMAN_PROMPT.format(language=language, filename=filename, sections=""))
+    ]
+    notes_tokens = sum(completion for _, completion in requests)
+    requests.append((count_message_tokens(reduce_messages, model) + notes_tokens, OPENAI_MAX_TOKENS))
+    return requests
+
+def estimate_run(
+    files: List[Dict[str, Any]],
+    model: str = OPENAI_MODEL,
+    max_in_flight: int = OPENAI_MAX_IN_FLIGHT,
+    requests_per_minute: int = OPENAI_RPM_LIMIT,
+    tokens_per_minute: int = OPENAI_TPM_LIMIT
+) -> Dict[str, Any]:
+    """
+    Estimate the tokens, cost and wall time of documenting a set of files
+    
+    No LLM is called. Missing file contents are downloaded, and files the
+    workflow would not send to the LLM (carried-over documentation, identical
+    blobs, cached documentation, empty, minified or generated files) cost
+    nothing. Files the model router sends to the fast model are priced at
+    its rates. Packing of small files is not modeled, so the estimate is an
+    upper bound for repositories with many small files.
+    
+    Args:
+        files: File information dictionaries selected by the workflow
+        model: OpenAI model name of the strong route
+        max_in_flight: Maximum number of LLM requests in flight at once
+        requests_per_minute: Account request limit
+        tokens_per_minute: Account token limit
+        
+    Returns:
+        Totals, a breakdown by directory and the most expensive files
+    """
+    missing = [file for file in files if not file.get("documentation") and not file.get("content")]
+    with ThreadPoolExecutor(max_workers=GITHUB_WALK_WORKERS) as executor:
+        for file, content in zip(missing, executor.map(get_file_content, [file["download_url"] for file in missing])):
+            file["content"] = content
+    
+    skipped = {"documented": 0, "duplicate": 0, "cached": 0, "unusable": 0}
+    seen_blobs = set()
+    file_estimates = []
+    request_count = 0
+    total_tokens = 0
+    total_latency = 0.0
+    
+    fan_in = compute_fan_in([(file["content"], file["path"]) for file in files if file.get("content")])
+    for file in files:
+        if file.get("documentation"):
+            skipped["documented"] += 1
+            continue
+        if file.get("sha") and file["sha"] in seen_blobs:
+            skipped["duplicate"] += 1
+            continue
+        if file.get("sha"):
+            seen_blobs.add(file["sha"])
+        
+        content = file["content"]
+        if not content or is_minified(content) or is_generated(content):
+            skipped["unusable"] += 1
+            continue
+        language = get_language_from_extension(os.path.splitext(file["name"])[1])
+        route = route_file(content, language, fan_in.get(file["path"], 0))
+        file_model = route["model"] if route["route"] == "fast" else model
+        if is_documentation_cached(content, file["name"], file_model):
+            skipped["cached"] += 1
+            continue
+        
+        prompt_price, completion_price = model_prices(file_model)
+        requests = plan_file_requests(content, file["name"], file_model)
+        prompt_tokens = sum(prompt for prompt, _ in requests)
+        completion_tokens = sum(completion for _, completion in requests)
+        latency = sum(ESTIMATE_REQUEST_OVERHEAD_SECONDS + completion / ESTIMATE_TOKENS_PER_SECOND for _, completion in requests)
+        
+        request_count += len(requests)
+        total_tokens += prompt_tokens + completion_tokens
+        total_latency += latency
+        file_estimates.append({
+            "path": file["path"],
+            "directory": os.path.dirname(file["path"]) or ".",
+            "route": route["route"],
+            "requests": len(requests),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost": (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+        })
+    
+    directories = {}
+    for estimate in file_estimates:
+        directory = directories.setdefault(estimate["directory"], {
+            "directory": estimate["directory"], "files": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0
+        })
+        directory["files"] += 1
+        directory["prompt_tokens"] += estimate["prompt_tokens"]
+        directory["completion_tokens"] += estimate["completion_tokens"]
+        directory["cost"] += estimate["cost"]
+    
+    routes = {}
+    for estimate in file_estimates:
+        route = routes.setdefault(estimate["route"], {"files": 0, "cost": 0.0})
+        route["files"] += 1
+        route["cost"] += estimate["cost"]
+    
+    # The run takes as long as the slower of the concurrency and the rate limits allow
+    concurrency_seconds = total_latency / max(max_in_flight, 1)
+    rate_seconds = 60 * max(request_count / requests_per_minute, total_tokens / tokens_per_minute)
+    
+    return {
+        "model": model,
+        "tokenizer": "tiktoken" if get_encoding(model) else "estimate",
+        "files": len(file_estimates),
+        "skipped": skipped,
+        "requests": request_count,
+        "prompt_tokens": sum(estimate["prompt_tokens"] for estimate in file_estimates),
+        "completion_tokens": sum(estimate["completion_tokens"] for estimate in file_estimates),
+        "cost": sum(estimate["cost"] for estimate in file_estimates),
+        "wall_seconds": max(concurrency_seconds, rate_seconds),
+        "routes": routes,
+        "directories": sorted(directories.values(), key=lambda directory: directory["cost"], reverse=True),
+        "top_files": sorted(file_estimates, key=lambda estimate: estimate["cost"], reverse=True)[:ESTIMATE_TOP_FILES]
+    }
\ No newline at end of file
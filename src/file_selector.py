@@ -0,0 +1,257 @@
+import os
+import re
+from typing import Dict, Any, Iterable, List, Optional, Pattern, Tuple
+from dotenv import load_dotenv
+
+from src.github_fetcher import get_file_content_by_path
+
+load_dotenv()
+
+# Size thresholds for documented files, in bytes
+SELECTION_MIN_BYTES = int(os.getenv("SELECTION_MIN_BYTES", "1"))
+SELECTION_MAX_BYTES = int(os.getenv("SELECTION_MAX_BYTES", str(256 * 1024)))
+
+# Code files selected for documentation
+CODE_EXTENSIONS = frozenset({'.py', '.js', '.ts', '.java', '.c', '.cpp', '.cs', '.go', '.rb', '.php'})
+
+# Directories that hold third-party code
+VENDORED_DIRECTORIES = frozenset({
+    'node_modules', 'bower_components', 'vendor', 'vendors', 'third_party',
+    'third-party', 'thirdparty', 'external', 'site-packages', 'venv', '.venv'
+})
+
+# Directories that hold build output
+GENERATED_DIRECTORIES = frozenset({'dist', 'build', 'out', 'target', '__generated__', '.next'})
+
+# File name endings produced by code generators and bundlers
+GENERATED_SUFFIXES = (
+    '_pb2.py', '_pb2_grpc.py', '.pb.go', '.pb.cc', '.pb.h', '.pb.js', '_pb.js', '_grpc_pb.js',
+    '.min.js', '.bundle.js', '.designer.cs', '.generated.cs', '.g.cs', '_generated.go',
+    '.gen.go', '.d.ts'
+)
+
+# Markers generators leave in the header of their output
+GENERATED_MARKERS = re.compile(
+    r"@generated|\bdo not edit\b|\bauto-?generated\b",
+    re.IGNORECASE
+)
+
+def _glob_to_regex(pattern: str) -> Pattern:
+    """Translate a gitignore-style glob into a regular expression on repository paths"""
+    anchored = "/" in pattern.rstrip("/")
+    pattern = pattern.strip("/")
+    
+    regex = ""
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            regex += "(?:.*/)?"
+            index += 3
+            continue
+        if pattern.startswith("/**", index) and index + 3 == len(pattern):
+            regex += "/.*"
+            index += 3
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", index + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                regex += "[" + pattern[index + 1:end].replace("!", "^", 1) + "]"
+                index = end
+        else:
+            regex += re.escape(char)
+        index += 1
+    
+    prefix = "" if anchored else "(?:.*/)?"
+    return re.compile(f"^{prefix}{regex}$")
+
+def _parse_gitignore(text: str) -> List[Tuple[Pattern, bool, bool]]:
+    """Parse .gitignore lines into (pattern, negated, directory only) rules"""
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        rules.append((_glob_to_regex(line), negated, line.endswith("/")))
+    return rules
+
+def _parse_gitattributes(text: str) -> List[Tuple[Pattern, Dict[str, bool]]]:
+    """Parse the linguist-vendored and linguist-generated settings of .gitattributes"""
+    rules = []
+    for line in text.splitlines():
+        parts = line.split()
+        if not parts or parts[0].startswith("#"):
+            continue
+        
+        attributes = {}
+        for attribute in parts[1:]:
+            name, _, value = attribute.partition("=")
+            if name.startswith(("-", "!")):
+                attributes[name[1:]] = False
+            else:
+                attributes[name] = value.lower() not in ("false", "0")
+        
+        linguist = {
+            name: value for name, value in attributes.items()
+            if name in ("linguist-vendored", "linguist-generated")
+        }
+        if linguist:
+            rules.append((_glob_to_regex(parts[0]), linguist))
+    return rules
+
+def is_minified(content: str) -> bool:
+    """
+    Guess whether file content is minified or bundled
+    
+    Args:
+        content: File content
+        
+    Returns:
+        True if the content is made of very long lines
+    """
+    lines = content.splitlines()
+    if not lines:
+        return False
+    longest = max(len(line) for line in lines)
+    return longest > 1000 or len(content) / len(lines) > 200
+
+def is_generated(content: str) -> bool:
+    """
+    Guess whether file content was produced by a code generator
+    
+    Args:
+        content: File content
+        
+    Returns:
+        True if the file header carries a generator marker
+    """
+    return bool(GENERATED_MARKERS.search(content[:1000]))
+
+class FileSelector:
+    """Decide which repository files are worth documenting"""
+    
+    def __init__(
+        self,
+        extensions: Iterable[str] = CODE_EXTENSIONS,
+        gitignore: str = "",
+        gitattributes: str = "",
+        min_bytes: int = SELECTION_MIN_BYTES,
+        max_bytes: int = SELECTION_MAX_BYTES
+    ):
+        self.extensions = frozenset(ext.lower() for ext in extensions)
+        self.ignore_rules = _parse_gitignore(gitignore)
+        self.attribute_rules = _parse_gitattributes(gitattributes)
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+    
+    @classmethod
+    def from_repository(cls, repo_owner: str, repo_name: str, ref: Optional[str] = None) -> "FileSelector":
+        """
+        Create a selector that honours the repository's .gitignore and .gitattributes
+        
+        Args:
+            repo_owner: Repository owner
+            repo_name: Repository name
+            ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+            
+        Returns:
+            Configured file selector
+        """
+        return cls(
+            gitignore=get_file_content_by_path(repo_owner, repo_name, ".gitignore", ref),
+            gitattributes=get_file_content_by_path(repo_owner, repo_name, ".gitattributes", ref)
+        )
+    
+    def is_ignored(self, path: str) -> bool:
+        """Check a path, and each of its directories, against the .gitignore rules"""
+        parts = path.split("/")
+        candidates = ["/".join(parts[:index]) for index in range(1, len(parts))]
+        
+        ignored = False
+        for regex, negated, directory_only in self.ignore_rules:
+            if any(regex.match(directory) for directory in candidates) or (
+                not directory_only and regex.match(path)
+            ):
+                ignored = not negated
+        return ignored
+    
+    def linguist_attribute(self, path: str, name: str) -> Optional[bool]:
+        """Get the value .gitattributes assigns to a linguist attribute for a path"""
+        value = None
+        for regex, attributes in self.attribute_rules:
+            if name in attributes and regex.match(path):
+                value = attributes[name]
+        return value
+    
+    def select_path(self, path: str, size: Optional[int] = None) -> bool:
+        """
+        Decide whether a file is worth documenting from its path and size alone
+        
+        Args:
+            path: Path of the file in the repository
+            size: Size of the file in bytes, if known
+            
+        Returns:
+            True if the file should be documented
+        """
+        name = path.rsplit("/", 1)[-1].lower()
+        if os.path.splitext(name)[1] not in self.extensions:
+            return False
+        if size is not None and not self.min_bytes <= size <= self.max_bytes:
+            return False
+        if name.endswith(GENERATED_SUFFIXES):
+            return False
+        
+        vendored = self.linguist_attribute(path, "linguist-vendored")
+        generated = self.linguist_attribute(path, "linguist-generated")
+        if vendored or generated:
+            return False
+        
+        directories = set(path.lower().split("/")[:-1])
+        if vendored is None and not directories.isdisjoint(VENDORED_DIRECTORIES):
+            return False
+        if generated is None and not directories.isdisjoint(GENERATED_DIRECTORIES):
+            return False
+        
+        return not self.is_ignored(path)
+    
+    def select_content(self, path: str, content: str) -> bool:
+        """
+        Decide whether a file is worth documenting once its content is known
+        
+        Args:
+            path: Path of the file in the repository
+            content: File content
+            
+        Returns:
+            True if the file is neither minified nor generated
+        """
+        if not self.min_bytes <= len(content.encode("utf-8")) <= self.max_bytes:
+            return False
+        if self.linguist_attribute(path, "linguist-generated") is False:
+            return not is_minified(content)
+        return not (is_minified(content) or is_generated(content))
+    
+    def select(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Filter repository listing entries down to the files worth documenting
+        
+        Args:
+            entries: File information dictionaries from a repository listing
+            
+        Returns:
+            The selected file entries
+        """
+        return [
+            entry for entry in entries
+            if entry["type"] == "file" and self.select_path(entry["path"], entry.get("size"))
+        ]
\ No newline at end of file
@@ -0,0 +1,125 @@
+import os
+import re
+import base64
+from typing import Callable, Dict, Any, Iterator, Optional, Tuple
+from dotenv import load_dotenv
+from git import Repo
+from git.exc import GitCommandError, InvalidGitRepositoryError, NoSuchPathError
+
+from src.github_fetcher import GITHUB_MAX_FILE_BYTES, is_binary_content
+
+load_dotenv()
+
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+# Persistent bare clones, one per repository
+CLONE_CACHE_DIR = os.getenv(
+    "CLONE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "documentation-generator", "clones")
+)
+
+# Full commit SHAs share one local ref instead of leaving one ref behind per commit
+COMMIT_SHA = re.compile(r"[0-9a-fA-F]{40}")
+PINNED_COMMIT_REF = "refs/documentation-generator/pinned-commit"
+
+def _git_environment() -> Dict[str, str]:
+    """Environment that authenticates git over HTTPS without storing the token on disk"""
+    environment = {"GIT_TERMINAL_PROMPT": "0"}
+    if GITHUB_TOKEN:
+        credentials = base64.b64encode(f"x-access-token:{GITHUB_TOKEN}".encode("utf-8")).decode("ascii")
+        environment.update({
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": "http.https://github.com/.extraheader",
+            "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}"
+        })
+    return environment
+
+def sync_repository(repo_owner: str, repo_name: str, ref: Optional[str] = None) -> Tuple[Repo, str]:
+    """
+    Bring the cached clone of a repository up to date with a ref
+    
+    The first call creates a bare shallow clone; later calls only fetch the
+    objects that changed since the previous run.
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+        
+    Returns:
+        Tuple of (repository, fetched commit SHA)
+    """
+    clone_path = os.path.join(CLONE_CACHE_DIR, repo_owner, f"{repo_name}.git")
+    try:
+        repo = Repo(clone_path)
+    except (InvalidGitRepositoryError, NoSuchPathError):
+        repo = Repo.init(clone_path, bare=True, mkdir=True)
+    
+    # Keep the fetched commit under a local ref so the next fetch can negotiate against it;
+    # branches and tags get one ref each, commit SHAs reuse a single one
+    remote_ref = ref or "HEAD"
+    if COMMIT_SHA.fullmatch(remote_ref):
+        local_ref = PINNED_COMMIT_REF
+    else:
+        local_ref = f"refs/documentation-generator/{remote_ref}"
+    url = f"https://github.com/{repo_owner}/{repo_name}.git"
+    
+    with repo.git.custom_environment(**_git_environment()):
+        repo.git.fetch(url, f"+{remote_ref}:{local_ref}", depth=1, no_tags=True)
+    
+    return repo, repo.commit(local_ref).hexsha
+
+def iter_clone_files(
+    repo_owner: str,
+    repo_name: str,
+    path: str = "",
+    ref: Optional[str] = None,
+    file_filter: Optional[Callable[[str], bool]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read the files of a repository from its local clone
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        path: Path within the repository
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+        file_filter: Predicate on the file path deciding which files to read
+        
+    Yields:
+        File information dictionaries with their content already filled in;
+        a path naming a file yields just that file
+    """
+    prefix = path.strip("/")
+    
+    try:
+        repo, commit_sha = sync_repository(repo_owner, repo_name, ref)
+        tree = repo.commit(commit_sha).tree
+        if prefix:
+            tree = tree / prefix
+    except (GitCommandError, KeyError) as e:
+        print(f"Error syncing local clone: {str(e)}")
+        return
+    
+    items = [tree] if tree.type == "blob" else tree.traverse()
+    for item in items:
+        if item.type != "blob":
+            continue
+        if file_filter and not file_filter(item.path):
+            continue
+        if item.size > GITHUB_MAX_FILE_BYTES:
+            print(f"Skipping {item.path}: {item.size} bytes exceeds the {GITHUB_MAX_FILE_BYTES} byte limit")
+            continue
+        
+        data = item.data_stream.read()
+        if is_binary_content(data):
+            continue
+        yield {
+            "name": item.name,
+            "path": item.path,
+            "download_url": f"https://raw.githubusercontent.com/{repo_owner}/{repo_name}/{commit_sha}/{item.path}",
+            "sha": item.hexsha,
+            "size": item.size,
+            "content": data.decode("utf-8", errors="replace"),
+            "documentation": ""
+        }
\ No newline at end of file
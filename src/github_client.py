@@ -0,0 +1,214 @@
+import os
+import hashlib
+import random
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from src.response_cache import get_response_cache
+
+load_dotenv()
+
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+# Connection pool and timeout settings
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "16"))
+GITHUB_CONNECT_TIMEOUT = float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5"))
+GITHUB_READ_TIMEOUT = float(os.getenv("GITHUB_READ_TIMEOUT", "30"))
+
+# Retry settings for server errors and rate limiting
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "5"))
+GITHUB_BACKOFF_BASE = float(os.getenv("GITHUB_BACKOFF_BASE", "1"))
+GITHUB_BACKOFF_MAX = float(os.getenv("GITHUB_BACKOFF_MAX", "60"))
+
+# Hosts that receive the GitHub token
+GITHUB_HOSTS = {"api.github.com", "raw.githubusercontent.com"}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Get the shared keep-alive session used for all GitHub traffic"""
+    global _session
+    
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=GITHUB_POOL_SIZE, pool_maxsize=GITHUB_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Compute how long to wait before retrying a request
+    
+    Args:
+        attempt: Zero-based number of the attempt that failed
+        retry_after: Delay requested by the server, if any
+        
+    Returns:
+        Delay in seconds, using full jitter on an exponential schedule
+    """
+    delay = random.uniform(0, min(GITHUB_BACKOFF_MAX, GITHUB_BACKOFF_BASE * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, GITHUB_BACKOFF_MAX))
+    return delay
+
+def retry_after_seconds(headers: Dict[str, Any]) -> Optional[float]:
+    """
+    Read the server's retry hint from response headers
+    
+    Args:
+        headers: Response headers
+        
+    Returns:
+        Seconds to wait, or None when the server gave no hint
+    """
+    if headers.get("Retry-After"):
+        try:
+            return float(headers["Retry-After"])
+        except ValueError:
+            return None
+    if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+        return max(0.0, float(headers["X-RateLimit-Reset"]) - time.time())
+    return None
+
+def is_retryable(status_code: int, headers: Dict[str, Any], body: str = "") -> bool:
+    """
+    Check whether a response is a transient failure worth retrying
+    
+    Args:
+        status_code: HTTP status code
+        headers: Response headers
+        body: Response body, used to recognise secondary rate limits
+        
+    Returns:
+        True for server errors, 429s and abuse/secondary rate limit 403s
+    """
+    if status_code >= 500 or status_code == 429:
+        return True
+    if status_code == 403:
+        return (
+            "Retry-After" in headers
+            or headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in body.lower()
+        )
+    return False
+
+def github_get(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    stream: bool = False
+) -> requests.Response:
+    """
+    Send a GET request through the shared session
+    
+    Transient failures are retried with jittered exponential backoff.
+    Requests are revalidated against the response cache, so an unchanged
+    resource is served from disk after a 304. Streamed bodies are only
+    cached once the caller hands them to cache_streamed_body. The caller is
+    responsible for calling raise_for_status on the result.
+    
+    Args:
+        url: URL to request
+        headers: Extra request headers
+        params: Query string parameters
+        stream: Whether to defer downloading the response body
+        
+    Returns:
+        The final response
+    """
+    request_headers = _github_headers(url, headers)
+    
+    cache = get_response_cache()
+    if cache is not None:
+        prepared_url = requests.Request("GET", url, params=params).prepare().url
+        cache_key = hashlib.sha256(f"{prepared_url}\n{request_headers.get('Accept', '')}".encode("utf-8")).hexdigest()
+        request_headers.update(cache.validators(cache_key))
+    
+    response = _send("GET", url, request_headers, params=params, stream=stream)
+    if cache is not None:
+        if stream and response.status_code != 304:
+            response.cache_key = cache_key
+        else:
+            response = cache.update(cache_key, response)
+    return response
+
+def cache_streamed_body(response: requests.Response, body: bytes) -> None:
+    """
+    Store the fully read body of a streamed response in the response cache
+    
+    Args:
+        response: Streamed response returned by github_get
+        body: The complete body read from it
+    """
+    cache = get_response_cache()
+    cache_key = getattr(response, "cache_key", None)
+    if cache is not None and cache_key:
+        cache.update(cache_key, response, body)
+
+def github_post(
+    url: str,
+    json: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None
+) -> requests.Response:
+    """
+    Send a POST request with a JSON body through the shared session
+    
+    Transient failures are retried with jittered exponential backoff. The
+    caller is responsible for calling raise_for_status on the result.
+    
+    Args:
+        url: URL to request
+        json: JSON request body
+        headers: Extra request headers
+        
+    Returns:
+        The final response
+    """
+    return _send("POST", url, _github_headers(url, headers), json=json)
+
+def _github_headers(url: str, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Build request headers, adding the token for GitHub hosts"""
+    request_headers = {}
+    if GITHUB_TOKEN and urlparse(url).hostname in GITHUB_HOSTS:
+        request_headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    request_headers.update(headers or {})
+    return request_headers
+
+def _send(method: str, url: str, headers: Dict[str, str], stream: bool = False, **kwargs) -> requests.Response:
+    """Send a request, retrying connection errors and transient failures"""
+    session = get_session()
+    attempt = 0
+    while True:
+        try:
+            response = session.request(
+                method,
+                url,
+                headers=headers,
+                stream=stream,
+                timeout=(GITHUB_CONNECT_TIMEOUT, GITHUB_READ_TIMEOUT),
+                **kwargs
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt >= GITHUB_MAX_RETRIES:
+                raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+        
+        body = "" if stream else response.text
+        if attempt < GITHUB_MAX_RETRIES and is_retryable(response.status_code, response.headers, body):
+            response.close()
+            time.sleep(backoff_delay(attempt, retry_after_seconds(response.headers)))
+            attempt += 1
+            continue
+        
+        return response
\ No newline at end of file
@@ -1,14 +1,53 @@
 import requests
 import os
-import base64
-from typing import List, Dict, Any, Optional
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
+from src.github_client import cache_streamed_body, github_get, github_post
+
 load_dotenv()
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
-def fetch_repo_files(repo_owner: str, repo_name: str, path: str = "") -> List[Dict[str, Any]]:
+# Number of directories listed concurrently when a recursive tree is truncated
+GITHUB_WALK_WORKERS = int(os.getenv("GITHUB_WALK_WORKERS", "8"))
+
+# Files larger than this are skipped instead of downloaded
+GITHUB_MAX_FILE_BYTES = int(os.getenv("GITHUB_MAX_FILE_BYTES", str(1024 * 1024)))
+
+# The contents API stops inlining files above this size; larger blobs go through the blobs API
+CONTENTS_API_MAX_BYTES = 1024 * 1024
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+# The compare endpoint stops listing changed files at this count
+COMPARE_MAX_FILES = 300
+
+# GraphQL batch retrieval settings
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+GRAPHQL_BATCH_BYTES = int(os.getenv("GRAPHQL_BATCH_BYTES", str(512 * 1024)))
+GRAPHQL_BATCH_MAX_FILES = int(os.getenv("GRAPHQL_BATCH_MAX_FILES", "100"))
+
+def git_blob_sha(data: bytes) -> str:
+    """
+    Compute the SHA git assigns to a blob with the given content
+    
+    Args:
+        data: Raw file content
+        
+    Returns:
+        Hex-encoded blob SHA, identical to the one reported by the GitHub API
+    """
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def fetch_repo_files(
+    repo_owner: str,
+    repo_name: str,
+    path: str = "",
+    ref: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """
     Fetch files from a GitHub repository
     
@@ -16,15 +55,16 @@ def fetch_repo_files(repo_owner: str, repo_name: str, path: str = "") -> List[Di
         repo_owner: Repository owner
         repo_name: Repository name
         path: Path within the repository
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
         
     Returns:
         List of file information dictionaries
     """
     url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{path}"
-    headers = {"Authorization": f"token {GITHUB_TOKEN}"}
+    params = {"ref": ref} if ref else None
     
     try:
-        response = requests.get(url, headers=headers)
+        response = github_get(url, params=params)
         response.raise_for_status()  # Raise an exception for HTTP errors
         
         return response.json()
@@ -32,48 +72,365 @@ def fetch_repo_files(repo_owner: str, repo_name: str, path: str = "") -> List[Di
         print(f"Error fetching GitHub data: {str(e)}")
         return []
 
-def get_file_content(download_url: str) -> str:
+def get_file_content(download_url: str, max_bytes: int = GITHUB_MAX_FILE_BYTES) -> str:
     """
     Get content of a file from GitHub
     
     Args:
         download_url: URL to download the file content
+        max_bytes: Size above which the download is abandoned
         
     Returns:
-        File content as string
+        File content as string, empty for binary or oversized files
     """
     try:
-        response = requests.get(download_url)
-        response.raise_for_status()
-        return response.text
+        with github_get(download_url, stream=True) as response:
+            response.raise_for_status()
+            return read_text_response(response, max_bytes)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching file content: {str(e)}")
         return ""
 
-def get_file_content_by_path(repo_owner: str, repo_name: str, file_path: str) -> str:
+def get_file_content_by_path(
+    repo_owner: str,
+    repo_name: str,
+    file_path: str,
+    ref: Optional[str] = None,
+    sha: Optional[str] = None,
+    size: Optional[int] = None,
+    max_bytes: int = GITHUB_MAX_FILE_BYTES
+) -> str:
     """
     Get content of a file by its path in the repository
     
+    The raw media type is requested so the body arrives unencoded and can be
+    streamed. Files too large for the contents API are read from the blobs
+    API when their SHA is known.
+    
     Args:
         repo_owner: Repository owner
         repo_name: Repository name
         file_path: Path to the file in the repository
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+        sha: Blob SHA of the file, if known
+        size: Size of the file in bytes, if known
+        max_bytes: Size above which the download is abandoned
         
     Returns:
-        File content as string
+        File content as string, empty for binary or oversized files
     """
-    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}"
-    headers = {"Authorization": f"token {GITHUB_TOKEN}"}
+    if size is not None and size > max_bytes:
+        print(f"Skipping {file_path}: {size} bytes exceeds the {max_bytes} byte limit")
+        return ""
+    
+    if sha and size is not None and size > CONTENTS_API_MAX_BYTES:
+        url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/git/blobs/{sha}"
+        params = None
+    else:
+        url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}"
+        params = {"ref": ref} if ref else None
     
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        with github_get(url, headers={"Accept": RAW_MEDIA_TYPE}, params=params, stream=True) as response:
+            response.raise_for_status()
+            return read_text_response(response, max_bytes)
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching file content by path: {str(e)}")
+        return ""
+
+def is_binary_content(sample: bytes) -> bool:
+    """
+    Guess whether file content is binary, the way git does
+    
+    Args:
+        sample: The first bytes of the file
         
-        content_data = response.json()
-        if content_data.get("encoding") == "base64" and content_data.get("content"):
-            content = base64.b64decode(content_data["content"]).decode("utf-8")
-            return content
+    Returns:
+        True if the sample contains a NUL byte
+    """
+    return b"\0" in sample[:8000]
+
+def read_text_response(response: requests.Response, max_bytes: int = GITHUB_MAX_FILE_BYTES) -> str:
+    """
+    Read a streamed response body as text, giving up early on binary or oversized files
+    
+    Args:
+        response: Response opened with stream=True
+        max_bytes: Size above which reading is abandoned
+        
+    Returns:
+        Decoded body, or an empty string if the file was skipped
+    """
+    content_length = response.headers.get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        print(f"Skipping {response.url}: {content_length} bytes exceeds the {max_bytes} byte limit")
         return ""
+    
+    chunks = []
+    total = 0
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+        if not chunks and is_binary_content(chunk):
+            return ""
+        total += len(chunk)
+        if total > max_bytes:
+            print(f"Skipping {response.url}: exceeds the {max_bytes} byte limit")
+            return ""
+        chunks.append(chunk)
+    
+    data = b"".join(chunks)
+    cache_streamed_body(response, data)
+    return data.decode("utf-8", errors="replace")
+
+def get_file_contents_batch(
+    repo_owner: str,
+    repo_name: str,
+    files: List[Dict[str, Any]],
+    ref: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Get the content of many files with batched GraphQL queries
+    
+    Files are packed into queries of aliased blob lookups up to a byte budget.
+    Files larger than the budget, or truncated by GraphQL, are fetched one by
+    one with get_file_content_by_path; binary files are skipped.
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        files: File information dictionaries with "path" and "size"
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+        
+    Returns:
+        Dictionary mapping file paths to their content
+    """
+    contents = {}
+    oversized = []
+    batches = []
+    batch = []
+    batch_bytes = 0
+    
+    for file in files:
+        size = file.get("size", 0)
+        if size > GRAPHQL_BATCH_BYTES:
+            oversized.append(file["path"])
+            continue
+        if batch and (batch_bytes + size > GRAPHQL_BATCH_BYTES or len(batch) >= GRAPHQL_BATCH_MAX_FILES):
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append(file["path"])
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    
+    for paths in batches:
+        try:
+            blobs = _query_blobs(repo_owner, repo_name, paths, ref or "HEAD")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Error fetching blobs with GraphQL: {str(e)}")
+            oversized.extend(paths)
+            continue
+        
+        for path, blob in zip(paths, blobs):
+            if not blob or blob.get("isBinary"):
+                continue
+            if blob.get("isTruncated") or blob.get("text") is None:
+                oversized.append(path)
+                continue
+            contents[path] = blob["text"]
+    
+    files_by_path = {file["path"]: file for file in files}
+    for path in oversized:
+        file = files_by_path[path]
+        content = get_file_content_by_path(repo_owner, repo_name, path, ref, file.get("sha"), file.get("size"))
+        if content:
+            contents[path] = content
+    
+    return contents
+
+def _query_blobs(repo_owner: str, repo_name: str, paths: List[str], ref: str) -> List[Optional[Dict[str, Any]]]:
+    """Look up a batch of blobs in one GraphQL query, returned in the order of paths"""
+    variables = {"owner": repo_owner, "name": repo_name}
+    declarations = ["$owner: String!", "$name: String!"]
+    fields = []
+    for index, path in enumerate(paths):
+        variables[f"e{index}"] = f"{ref}:{path}"
+        declarations.append(f"$e{index}: String!")
+        fields.append(
+            f"f{index}: object(expression: $e{index}) "
+            "{ ... on Blob { byteSize isBinary isTruncated text } }"
+        )
+    
+    query = (
+        f"query({', '.join(declarations)}) "
+        "{ repository(owner: $owner, name: $name) { " + " ".join(fields) + " } }"
+    )
+    
+    response = github_post(GITHUB_GRAPHQL_URL, json={"query": query, "variables": variables})
+    response.raise_for_status()
+    
+    result = response.json()
+    if result.get("errors") and not result.get("data"):
+        raise ValueError(result["errors"][0].get("message", "GraphQL query failed"))
+    
+    repository = (result.get("data") or {}).get("repository") or {}
+    return [repository.get(f"f{index}") for index in range(len(paths))]
+
+def resolve_ref(repo_owner: str, repo_name: str, ref: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Resolve a branch, tag or commit to its commit SHA and root tree SHA
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+        
+    Returns:
+        Tuple of (commit SHA, tree SHA)
+    """
+    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/commits/{ref or 'HEAD'}"
+    
+    response = github_get(url)
+    response.raise_for_status()
+    
+    commit_data = response.json()
+    return commit_data["sha"], commit_data["commit"]["tree"]["sha"]
+
+def fetch_repo_tree(
+    repo_owner: str,
+    repo_name: str,
+    path: str = "",
+    ref: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fetch every file and directory below a path using the Git Trees API
+    
+    The whole recursive tree is retrieved in a single request. If GitHub
+    truncates the response, the listing falls back to a parallel walk of
+    the contents API.
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        path: Path within the repository
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+        
+    Returns:
+        List of file information dictionaries in the same shape as fetch_repo_files,
+        with blob SHAs and sizes
+    """
+    prefix = path.strip("/")
+    
+    try:
+        commit_sha, tree_sha = resolve_ref(repo_owner, repo_name, ref)
+        
+        url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/git/trees/{tree_sha}"
+        response = github_get(url, params={"recursive": "1"})
+        response.raise_for_status()
+        tree_data = response.json()
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching file content by path: {str(e)}")
-        return ""
\ No newline at end of file
+        print(f"Error fetching GitHub tree: {str(e)}")
+        return []
+    
+    if tree_data.get("truncated"):
+        print(f"Tree for {repo_owner}/{repo_name} is truncated, walking directories instead")
+        return walk_repo_files(repo_owner, repo_name, prefix, commit_sha)
+    
+    files = []
+    for entry in tree_data.get("tree", []):
+        entry_path = entry["path"]
+        if prefix and not entry_path.startswith(prefix + "/"):
+            continue
+        
+        if entry["type"] == "blob":
+            entry_type = "file"
+            download_url = f"https://raw.githubusercontent.com/{repo_owner}/{repo_name}/{commit_sha}/{entry_path}"
+        elif entry["type"] == "tree":
+            entry_type = "dir"
+            download_url = None
+        else:
+            # Submodule commits have no content in this repository
+            continue
+        
+        files.append({
+            "name": entry_path.rsplit("/", 1)[-1],
+            "path": entry_path,
+            "type": entry_type,
+            "sha": entry["sha"],
+            "size": entry.get("size", 0),
+            "download_url": download_url
+        })
+    
+    return files
+
+def walk_repo_files(
+    repo_owner: str,
+    repo_name: str,
+    path: str = "",
+    ref: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Recursively list a repository path with the contents API, one level at a time
+    
+    All directories of a level are listed concurrently.
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        path: Path within the repository
+        ref: Branch, tag or commit SHA (defaults to the repository's default branch)
+        
+    Returns:
+        List of file information dictionaries
+    """
+    files = []
+    pending = [path]
+    
+    with ThreadPoolExecutor(max_workers=GITHUB_WALK_WORKERS) as executor:
+        while pending:
+            listings = executor.map(
+                lambda directory: fetch_repo_files(repo_owner, repo_name, directory, ref),
+                pending
+            )
+            pending = []
+            for listing in listings:
+                for entry in listing:
+                    files.append(entry)
+                    if entry["type"] == "dir":
+                        pending.append(entry["path"])
+    
+    return files
+
+def compare_commits(
+    repo_owner: str,
+    repo_name: str,
+    base: str,
+    head: str
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    List the files that changed between two commits
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        base: Older commit SHA
+        head: Newer commit SHA
+        
+    Returns:
+        File change dictionaries with "filename", "status", "previous_filename"
+        and "patch", or None if the comparison failed or is too large to be complete
+    """
+    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/compare/{base}...{head}"
+    
+    try:
+        response = github_get(url)
+        response.raise_for_status()
+        files = response.json().get("files", [])
+    except requests.exceptions.RequestException as e:
+        print(f"Error comparing commits: {str(e)}")
+        return None
+    
+    # GitHub lists at most 300 changed files per comparison
+    if len(files) >= COMPARE_MAX_FILES:
+        return None
+    return files
\ No newline at end of file
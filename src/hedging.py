@@ -0,0 +1,216 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Any, List, Optional, TypeVar
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Hedged requests are opt-in: a slow LLM call gets a duplicate, the first good answer wins
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "False").lower() in ("true", "1", "t")
+
+# A call is hedged once it runs longer than this percentile of recent calls to its model
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+# Hedges may add at most this share of extra requests
+HEDGE_MAX_EXTRA_RATIO = float(os.getenv("HEDGE_MAX_EXTRA_RATIO", "0.1"))
+
+T = TypeVar("T")
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Get a percentile of some values with the nearest-rank method
+    
+    Args:
+        values: Values to rank
+        pct: Percentile between 0 and 100
+        
+    Returns:
+        The percentile, or None without values
+    """
+    if not values:
+        return None
+    ranked = sorted(values)
+    return ranked[max(math.ceil(pct / 100 * len(ranked)), 1) - 1]
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def _run(coroutine: Awaitable[T]) -> T:
+    """
+    Run a coroutine on the event loop shared by all LLM calls and wait for its result
+    
+    A single long-lived loop keeps the async OpenAI client's connections on
+    one loop, whichever worker thread makes the call.
+    """
+    global _loop
+    
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coroutine, _loop).result()
+
+class HedgeTracker:
+    """Decide when to hedge LLM calls and keep their latency statistics"""
+    
+    def __init__(
+        self,
+        enabled: bool = HEDGING_ENABLED,
+        pct: float = HEDGE_PERCENTILE,
+        window: int = HEDGE_WINDOW,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        max_extra_ratio: float = HEDGE_MAX_EXTRA_RATIO
+    ):
+        self.enabled = enabled
+        self.pct = pct
+        self.window = window
+        self.min_samples = min_samples
+        self.max_extra_ratio = max_extra_ratio
+        self._lock = threading.Lock()
+        self._recent = {}
+        self.reset()
+    
+    def reset(self) -> None:
+        """Start new statistics; recent latencies are kept for the threshold"""
+        with self._lock:
+            self._requests = 0
+            self._hedges = 0
+            self._hedge_wins = 0
+            self._unhedged = []
+            self._effective = []
+    
+    def threshold(self, key: str) -> Optional[float]:
+        """Get the running time after which a call to this model is hedged, None before enough samples"""
+        with self._lock:
+            recent = list(self._recent.get(key, ()))
+        if len(recent) < self.min_samples:
+            return None
+        return percentile(recent, self.pct)
+    
+    def _record_primary(self, key: str, seconds: float) -> None:
+        """Record how long a call took without help from a hedge"""
+        with self._lock:
+            self._recent.setdefault(key, deque(maxlen=self.window)).append(seconds)
+            self._unhedged.append(seconds)
+    
+    def _spend_hedge(self) -> bool:
+        """Reserve one extra request if the budget allows it"""
+        with self._lock:
+            if self._hedges + 1 > self.max_extra_ratio * self._requests:
+                return False
+            self._hedges += 1
+            return True
+    
+    def call(
+        self,
+        key: str,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Optional[Callable[[], Awaitable[T]]] = None
+    ) -> T:
+        """
+        Make a call, firing a duplicate when it runs unusually long
+        
+        Once the primary call outlives the threshold of its model and the
+        extra request budget allows it, the hedge is started. The first call
+        to succeed wins; the other one is cancelled, which closes its request.
+        An abandoned primary call counts towards the latency statistics with
+        the time it had run. If both fail, the primary call's error is raised.
+        
+        Args:
+            key: Model name the latency percentiles are kept for
+            primary: Coroutine function making the call
+            hedge: Coroutine function making the duplicate call, by default
+                the primary call again
+                
+        Returns:
+            The result of the winning call
+        """
+        return _run(self._race(key, primary, hedge or primary))
+    
+    async def _race(
+        self,
+        key: str,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Run the primary call and, if it is slow, its hedge; return the first success"""
+        with self._lock:
+            self._requests += 1
+        started = time.monotonic()
+        
+        first = asyncio.ensure_future(primary())
+        pending = {first}
+        threshold = self.threshold(key) if self.enabled else None
+        if threshold is not None:
+            done, _ = await asyncio.wait(pending, timeout=threshold)
+            if not done and self._spend_hedge():
+                pending.add(asyncio.ensure_future(hedge()))
+        
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    break
+                if not pending:
+                    raise first.exception()
+        finally:
+            # Cancel the loser, and whatever is left if this call itself is cancelled
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        
+        elapsed = time.monotonic() - started
+        if winner is first or first.cancelled():
+            self._record_primary(key, elapsed)
+        with self._lock:
+            self._effective.append(elapsed)
+            if winner is not first:
+                self._hedge_wins += 1
+        return winner.result()
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarise hedging since the last reset
+        
+        Returns:
+            Calls, hedges, hedge rate, hedges that won, and p50/p95/p99 latency
+            of the primary calls alone ("unhedged") and of the results
+            actually used ("hedged")
+        """
+        with self._lock:
+            unhedged = list(self._unhedged)
+            effective = list(self._effective)
+            summary = {
+                "enabled": self.enabled,
+                "requests": self._requests,
+                "hedges": self._hedges,
+                "hedge_rate": round(self._hedges / self._requests, 3) if self._requests else 0.0,
+                "hedge_wins": self._hedge_wins
+            }
+        
+        for name, values in (("unhedged", unhedged), ("hedged", effective)):
+            summary[name] = {
+                f"p{pct}": round(percentile(values, pct), 2) if values else None
+                for pct in (50, 95, 99)
+            }
+        return summary
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+def get_hedge_tracker() -> HedgeTracker:
+    """Get the hedge tracker shared by all LLM calls"""
+    global _tracker
+    
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = HedgeTracker()
+        return _tracker
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 # Pre-generated mock documentation for common files
 MOCK_DOCUMENTATION = {
@@ -122,8 +122,30 @@ These functions are placeholders that would be implemented with actual data proc
 """
 }
 
-def analyze_code(code: str, filename: str) -> str:
+def analyze_code(
+    code: str,
+    filename: str,
+    stats: Optional[Dict[str, Any]] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    model: Optional[str] = None,
+    previous_documentation: Optional[str] = None,
+    patch: Optional[str] = None
+) -> str:
     """Mock implementation of analyze_code"""
+    if stats is not None:
+        stats["cache_hit"] = False
+        stats.setdefault("route", "strong")
+        stats["model"] = model or "mock-model"
+    
+    documentation = _mock_documentation(filename)
+    if on_token:
+        # Stream the documentation line by line
+        for line in documentation.splitlines(keepends=True):
+            on_token(line)
+    return documentation
+
+def _mock_documentation(filename: str) -> str:
+    """Get the mock documentation of a file"""
     # Return pre-generated documentation if available
     if filename in MOCK_DOCUMENTATION:
         return MOCK_DOCUMENTATION[filename]
@@ -144,6 +166,32 @@ This file contains code for the application.
 This is a mock documentation generated for testing purposes.
 """
 
+def analyze_files(
+    files: List[Tuple[str, str]],
+    max_in_flight: int = 8,
+    on_token: Optional[Callable[[int, str], None]] = None,
+    on_file: Optional[Callable[[int, str, Dict[str, Any]], None]] = None,
+    previous: Optional[List[Optional[Tuple[str, str]]]] = None,
+    paths: Optional[List[str]] = None
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Mock implementation of analyze_files"""
+    results = []
+    for index, (code, filename) in enumerate(files):
+        stats = {}
+        stream = (lambda delta, index=index: on_token(index, delta)) if on_token else None
+        documentation = analyze_code(code, filename, stats, stream)
+        if on_file:
+            on_file(index, documentation, stats)
+        results.append((documentation, stats))
+    return results
+
+def retitle_documentation(documentation: str, filename: str) -> str:
+    """Mock implementation of retitle_documentation"""
+    lines = documentation.split("\n", 1)
+    if lines[0].startswith("# File:"):
+        lines[0] = f"# File: {filename}"
+    return "\n".join(lines)
+
 def analyze_repository_structure(files: List[Dict[str, Any]]) -> str:
     """Mock implementation of analyze_repository_structure"""
     return """# Repository Structure Analysis
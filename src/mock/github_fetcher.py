@@ -1,5 +1,6 @@
 import os
-from typing import List, Dict, Any
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
 import json
 
 # Sample mock repository data
@@ -54,6 +55,10 @@ MOCK_REPO_DATA = {
 
 # Sample mock file content
 MOCK_FILE_CONTENT = {
+    ".gitignore": """__pycache__/
+*.pyc
+venv/
+""",
     "app.py": """
 import streamlit as st
 from src.main import process_data
@@ -110,17 +115,64 @@ def analyze_data(data, params):
 """
 }
 
-def fetch_repo_files(repo_owner: str, repo_name: str, path: str = "") -> List[Dict[str, Any]]:
+def _mock_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the blob SHA and size a real listing would report"""
+    if entry["type"] != "file":
+        return {**entry, "sha": hashlib.sha1(entry["path"].encode("utf-8")).hexdigest(), "size": 0}
+    
+    data = get_file_content_by_path("", "", entry["path"]).encode("utf-8")
+    return {**entry, "sha": git_blob_sha(data), "size": len(data)}
+
+def git_blob_sha(data: bytes) -> str:
+    """Mock implementation of git_blob_sha"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def fetch_repo_files(
+    repo_owner: str,
+    repo_name: str,
+    path: str = "",
+    ref: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """Mock implementation of fetch_repo_files"""
     # For testing, we'll just return mock data based on the path
     if path == "":
-        return MOCK_REPO_DATA["main"]
+        return [_mock_entry(entry) for entry in MOCK_REPO_DATA["main"]]
     elif path == "src":
-        return MOCK_REPO_DATA["src"]
+        return [_mock_entry(entry) for entry in MOCK_REPO_DATA["src"]]
     else:
         return []
 
-def get_file_content(download_url: str) -> str:
+def resolve_ref(repo_owner: str, repo_name: str, ref: Optional[str] = None) -> Tuple[str, str]:
+    """Mock implementation of resolve_ref"""
+    return "mock-commit-sha", "mock-tree-sha"
+
+def fetch_repo_tree(
+    repo_owner: str,
+    repo_name: str,
+    path: str = "",
+    ref: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Mock implementation of fetch_repo_tree"""
+    return walk_repo_files(repo_owner, repo_name, path, ref)
+
+def walk_repo_files(
+    repo_owner: str,
+    repo_name: str,
+    path: str = "",
+    ref: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Mock implementation of walk_repo_files"""
+    files = []
+    pending = [path]
+    while pending:
+        directory = pending.pop(0)
+        for entry in fetch_repo_files(repo_owner, repo_name, directory, ref):
+            files.append(entry)
+            if entry["type"] == "dir":
+                pending.append(entry["path"])
+    return files
+
+def get_file_content(download_url: str, max_bytes: int = 1024 * 1024) -> str:
     """Mock implementation of get_file_content"""
     # Extract the file path from the mock download URL
     file_path = download_url.replace("https://mock-github.com/download/", "")
@@ -131,9 +183,35 @@ def get_file_content(download_url: str) -> str:
     else:
         return f"Mock content for {file_path}"
 
-def get_file_content_by_path(repo_owner: str, repo_name: str, file_path: str) -> str:
+def get_file_content_by_path(
+    repo_owner: str,
+    repo_name: str,
+    file_path: str,
+    ref: Optional[str] = None,
+    sha: Optional[str] = None,
+    size: Optional[int] = None,
+    max_bytes: int = 1024 * 1024
+) -> str:
     """Mock implementation of get_file_content_by_path"""
     if file_path in MOCK_FILE_CONTENT:
         return MOCK_FILE_CONTENT[file_path]
     else:
-        return f"Mock content for {file_path}"
\ No newline at end of file
+        return f"Mock content for {file_path}"
+
+def get_file_contents_batch(
+    repo_owner: str,
+    repo_name: str,
+    files: List[Dict[str, Any]],
+    ref: Optional[str] = None
+) -> Dict[str, str]:
+    """Mock implementation of get_file_contents_batch"""
+    return {file["path"]: get_file_content_by_path(repo_owner, repo_name, file["path"], ref) for file in files}
+
+def compare_commits(
+    repo_owner: str,
+    repo_name: str,
+    base: str,
+    head: str
+) -> Optional[List[Dict[str, Any]]]:
+    """Mock implementation of compare_commits"""
+    return []
\ No newline at end of file
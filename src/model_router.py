@@ -0,0 +1,131 @@
+import ast
+import os
+import re
+from typing import Dict, Any, List, Tuple
+from dotenv import load_dotenv
+
+from src.tokens import estimate_tokens
+
+load_dotenv()
+
+# The strong model gets complex files, the fast model everything else
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
+OPENAI_FAST_MODEL = os.getenv("OPENAI_FAST_MODEL", "gpt-4o-mini")
+ROUTING_ENABLED = os.getenv("ROUTING_ENABLED", "True").lower() in ("true", "1", "t")
+
+# A file is simple when it stays within every one of these thresholds
+ROUTE_MAX_SIMPLE_TOKENS = int(os.getenv("ROUTE_MAX_SIMPLE_TOKENS", "1500"))
+ROUTE_MAX_SIMPLE_NODES = int(os.getenv("ROUTE_MAX_SIMPLE_NODES", "600"))
+ROUTE_MAX_SIMPLE_COMPLEXITY = int(os.getenv("ROUTE_MAX_SIMPLE_COMPLEXITY", "15"))
+ROUTE_MAX_SIMPLE_FAN_IN = int(os.getenv("ROUTE_MAX_SIMPLE_FAN_IN", "3"))
+
+_BRANCH_KEYWORDS = re.compile(r"\b(?:if|elif|else if|for|foreach|while|case|catch|except|when)\b|&&|\|\||\?")
+_LEXICAL_TOKEN = re.compile(r"\w+|[^\s\w]")
+_IMPORT_LINE = re.compile(r"^\s*(?:import|from|require|#include|using|use|load)\b.*$|require\(.*?\)", re.MULTILINE)
+_PYTHON_BRANCHES = (
+    ast.If, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler, ast.With, ast.AsyncWith,
+    ast.IfExp, ast.BoolOp, ast.comprehension, ast.Assert
+)
+
+def compute_fan_in(files: List[Tuple[str, str]]) -> Dict[str, int]:
+    """
+    Count how many other files import each file
+    
+    Imports are matched by module name (the file name without extension)
+    against the words on import-like lines, which is cheap and good enough to
+    spot widely used modules. When several files share a module name, an
+    import only counts for the one in the importer's own directory or whose
+    directory the import line names.
+    
+    Args:
+        files: (code, repository path) pairs of one run
+        
+    Returns:
+        Number of importing files, by repository path
+    """
+    imported_words = []
+    for code, path in files:
+        words = set()
+        for line in _IMPORT_LINE.findall(code):
+            words.update(re.findall(r"\w+", line))
+        imported_words.append((path, words))
+    
+    namesakes = {}
+    for _, path in files:
+        module = os.path.splitext(os.path.basename(path))[0]
+        namesakes[module] = namesakes.get(module, 0) + 1
+    
+    fan_in = {}
+    for _, path in files:
+        module = os.path.splitext(os.path.basename(path))[0]
+        directory = os.path.dirname(path)
+        fan_in[path] = sum(
+            1 for importer, words in imported_words
+            if importer != path and module in words and (
+                namesakes[module] == 1
+                or os.path.dirname(importer) == directory
+                or os.path.basename(directory) in words
+            )
+        )
+    return fan_in
+
+def score_file(code: str, language: str, fan_in: int = 0) -> Dict[str, int]:
+    """
+    Score how hard a file is to document, cheaply
+    
+    Args:
+        code: Source code
+        language: Language name
+        fan_in: Number of other files importing this one
+        
+    Returns:
+        Estimated tokens, syntax nodes (AST nodes for Python, approximated
+        from lexical tokens elsewhere), cyclomatic complexity estimate and fan-in
+    """
+    nodes = None
+    complexity = None
+    if language == "Python":
+        try:
+            tree = ast.parse(code)
+            all_nodes = list(ast.walk(tree))
+            nodes = len(all_nodes)
+            complexity = 1 + sum(1 for node in all_nodes if isinstance(node, _PYTHON_BRANCHES))
+        except (SyntaxError, ValueError):
+            pass
+    
+    if nodes is None:
+        nodes = len(_LEXICAL_TOKEN.findall(code)) // 2
+        complexity = 1 + len(_BRANCH_KEYWORDS.findall(code))
+    
+    return {
+        "tokens": estimate_tokens(code),
+        "nodes": nodes,
+        "complexity": complexity,
+        "fan_in": fan_in
+    }
+
+def route_file(code: str, language: str, fan_in: int = 0) -> Dict[str, Any]:
+    """
+    Pick the model that documents a file
+    
+    Args:
+        code: Source code
+        language: Language name
+        fan_in: Number of other files importing this one
+        
+    Returns:
+        The route ("fast" or "strong"), its model and the file's score
+    """
+    if not ROUTING_ENABLED or not OPENAI_FAST_MODEL:
+        return {"route": "strong", "model": OPENAI_MODEL, "score": {}}
+    
+    score = score_file(code, language, fan_in)
+    simple = (
+        score["tokens"] <= ROUTE_MAX_SIMPLE_TOKENS
+        and score["nodes"] <= ROUTE_MAX_SIMPLE_NODES
+        and score["complexity"] <= ROUTE_MAX_SIMPLE_COMPLEXITY
+        and score["fan_in"] <= ROUTE_MAX_SIMPLE_FAN_IN
+    )
+    if simple:
+        return {"route": "fast", "model": OPENAI_FAST_MODEL, "score": score}
+    return {"route": "strong", "model": OPENAI_MODEL, "score": score}
\ No newline at end of file
@@ -0,0 +1,88 @@
+import ast
+import os
+from typing import List, Tuple
+from dotenv import load_dotenv
+
+from src.tokens import estimate_tokens
+
+load_dotenv()
+
+# Prompt budget for Python files; longer function bodies are elided to meet it
+SKELETON_BUDGET_TOKENS = int(os.getenv("SKELETON_BUDGET_TOKENS", "4000"))
+
+def _function_bodies(tree: ast.AST) -> List[Tuple[int, int, int]]:
+    """
+    Find the elidable body of every function in a module
+    
+    Args:
+        tree: Parsed module
+        
+    Returns:
+        (first line, last line, indentation) of each function body, leaving
+        out docstrings and bodies written on the same line as the signature
+    """
+    bodies = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        
+        statements = node.body
+        if ast.get_docstring(node) is not None:
+            statements = statements[1:]
+        if not statements:
+            continue
+        
+        first = statements[0]
+        if first.lineno <= node.lineno:
+            continue
+        bodies.append((first.lineno, node.end_lineno, first.col_offset))
+    return bodies
+
+def build_python_skeleton(code: str, token_budget: int = SKELETON_BUDGET_TOKENS) -> Tuple[str, int]:
+    """
+    Shrink a Python module to its structure so it fits a prompt token budget
+    
+    Imports, decorators, class and function signatures with their type hints,
+    docstrings and module-level code are kept verbatim. Function bodies are
+    replaced by a placeholder, longest first, until the module fits the
+    budget, so short functions keep their full bodies.
+    
+    Args:
+        code: Python source code
+        token_budget: Estimated token count the result should fit in
+        
+    Returns:
+        The skeleton and the number of elided function bodies; the code is
+        returned unchanged when it already fits or cannot be parsed
+    """
+    total_tokens = estimate_tokens(code)
+    if total_tokens <= token_budget:
+        return code, 0
+    
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return code, 0
+    
+    lines = code.splitlines()
+    
+    def body_tokens(body: Tuple[int, int, int]) -> int:
+        first, last, _ = body
+        return estimate_tokens("\n".join(lines[first - 1:last]))
+    
+    # Elide the largest bodies first; bodies nested in an elided one go with it
+    elided = []
+    for body in sorted(_function_bodies(tree), key=body_tokens, reverse=True):
+        if total_tokens <= token_budget:
+            break
+        first, last, _ = body
+        if any(outer_first <= first and last <= outer_last for outer_first, outer_last, _ in elided):
+            continue
+        elided.append(body)
+        total_tokens -= body_tokens(body)
+    
+    for first, last, indent in sorted(elided, reverse=True):
+        placeholder = " " * indent + f"...  # {last - first + 1} lines elided"
+        lines[first - 1:last] = [placeholder]
+    
+    return "\n".join(lines), len(elided)
\ No newline at end of file
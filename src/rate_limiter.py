@@ -0,0 +1,169 @@
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Account limits of the OpenAI API, per minute
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "40000"))
+
+# Retry settings for rate limited LLM calls
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "6"))
+OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", "1"))
+OPENAI_BACKOFF_MAX = float(os.getenv("OPENAI_BACKOFF_MAX", "60"))
+
+# Length of the sliding window the limits apply to, in seconds
+WINDOW_SECONDS = 60.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+class RateLimiter:
+    """Budget requests and tokens per minute across threads"""
+    
+    def __init__(self, requests_per_minute: int = OPENAI_RPM_LIMIT, tokens_per_minute: int = OPENAI_TPM_LIMIT):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._condition = threading.Condition()
+        self._window = deque()
+        self._window_tokens = 0
+        self._paused_until = 0.0
+    
+    def _expire(self, now: float) -> None:
+        """Drop reservations that left the sliding window"""
+        while self._window and self._window[0][0] <= now - WINDOW_SECONDS:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+    
+    def acquire(self, tokens: int) -> List[Any]:
+        """
+        Block until a request of the given size fits in both budgets
+        
+        A request larger than the whole token budget is admitted once the
+        window is empty, so it is slowed down rather than refused.
+        
+        Args:
+            tokens: Estimated prompt tokens plus the completion token limit
+            
+        Returns:
+            The reservation, to be passed to settle once usage is known
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                
+                wait = self._paused_until - now
+                if wait <= 0:
+                    fits_requests = len(self._window) < self.requests_per_minute
+                    fits_tokens = not self._window or self._window_tokens + tokens <= self.tokens_per_minute
+                    if fits_requests and fits_tokens:
+                        reservation = [now, tokens]
+                        self._window.append(reservation)
+                        self._window_tokens += tokens
+                        return reservation
+                    wait = self._window[0][0] + WINDOW_SECONDS - now
+                
+                self._condition.wait(max(wait, 0.01))
+    
+    def settle(self, reservation: List[Any], tokens: int) -> None:
+        """
+        Replace the estimated size of a reservation with the actual usage
+        
+        Args:
+            reservation: Reservation returned by acquire
+            tokens: Tokens the request actually consumed
+        """
+        with self._condition:
+            if reservation in self._window:
+                self._window_tokens += tokens - reservation[1]
+                reservation[1] = tokens
+            self._condition.notify_all()
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every caller after the server reported a rate limit
+        
+        Args:
+            seconds: How long to wait before the next request
+        """
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parse an OpenAI reset duration such as "1s", "6m0s" or "20ms"
+    
+    Args:
+        value: Duration header value
+        
+    Returns:
+        Seconds, or None if the value is not a duration
+    """
+    parts = _DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+def openai_retry_after(headers: Dict[str, Any]) -> Optional[float]:
+    """
+    Read the server's retry hint from an OpenAI rate limit response
+    
+    Args:
+        headers: Response headers
+        
+    Returns:
+        Seconds to wait, or None when the server gave no hint
+    """
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+    
+    resets = [
+        parse_duration(headers.get(name, ""))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if headers.get(f"x-ratelimit-remaining-{name.rsplit('-', 1)[-1]}") == "0"
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+def openai_backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Compute how long to wait before retrying a rate limited LLM call
+    
+    Args:
+        attempt: Zero-based number of the attempt that failed
+        retry_after: Delay requested by the server, if any
+        
+    Returns:
+        Delay in seconds, using full jitter on an exponential schedule
+    """
+    delay = random.uniform(0, min(OPENAI_BACKOFF_MAX, OPENAI_BACKOFF_BASE * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, OPENAI_BACKOFF_MAX))
+    return delay
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the rate limiter shared by all LLM calls"""
+    global _limiter
+    
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
\ No newline at end of file
@@ -0,0 +1,168 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# On-disk cache of GitHub responses, revalidated with conditional requests
+GITHUB_CACHE_ENABLED = os.getenv("GITHUB_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+GITHUB_CACHE_PATH = os.getenv(
+    "GITHUB_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "documentation-generator", "github-responses.sqlite")
+)
+GITHUB_CACHE_MAX_BYTES = int(os.getenv("GITHUB_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+class ResponseCache:
+    """Size-bounded LRU store of response bodies with their validators"""
+    
+    def __init__(self, path: str, max_bytes: int):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                body BLOB,
+                size INTEGER,
+                last_access REAL
+            )"""
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._connection.commit()
+        self._total_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    
+    def validators(self, key: str) -> Dict[str, str]:
+        """
+        Get the conditional request headers for a cached response
+        
+        Args:
+            key: Cache key of the request
+            
+        Returns:
+            If-None-Match / If-Modified-Since headers, empty when nothing is cached
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+    
+    def update(self, key: str, response: requests.Response, body: Optional[bytes] = None) -> requests.Response:
+        """
+        Store a fresh response or serve the cached body for a 304
+        
+        Args:
+            key: Cache key of the request
+            response: Response to a (possibly conditional) request
+            body: Body already read from a streamed response
+            
+        Returns:
+            The response, with the cached body and a 200 status if it was a 304
+        """
+        with self._lock:
+            if response.status_code == 304:
+                row = self._connection.execute(
+                    "SELECT content_type, body FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return response
+                
+                self._connection.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+                )
+                self._connection.commit()
+                self.hits += 1
+                
+                response.status_code = 200
+                response._content = row[1]
+                response._content_consumed = True
+                if row[0]:
+                    response.headers["Content-Type"] = row[0]
+                return response
+            
+            self.misses += 1
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if response.status_code != 200 or not (etag or last_modified):
+                return response
+            
+            if body is None:
+                body = response.content
+            if len(body) > self.max_bytes:
+                return response
+            
+            previous = self._connection.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, response.headers.get("Content-Type"), body, len(body), time.time())
+            )
+            self._total_bytes += len(body) - (previous[0] if previous else 0)
+            self._evict()
+            self._connection.commit()
+            return response
+    
+    def _evict(self) -> None:
+        """Drop least recently used responses until the cache fits its size bound"""
+        while self._total_bytes > self.max_bytes:
+            row = self._connection.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self._total_bytes -= row[1]
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+            self._total_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current cache size"""
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        requests_seen = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests_seen if requests_seen else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self._total_bytes
+        }
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the shared response cache, or None when caching is disabled"""
+    global _cache
+    
+    if not GITHUB_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(GITHUB_CACHE_PATH, GITHUB_CACHE_MAX_BYTES)
+        return _cache
\ No newline at end of file
@@ -0,0 +1,130 @@
+import os
+import json
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from src.code_analyzer import retitle_documentation
+
+load_dotenv()
+
+# Where the last documented commit of each (owner, repo, path) is remembered
+RUN_STATE_DIR = os.getenv(
+    "RUN_STATE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "documentation-generator", "runs")
+)
+
+def repository_state_path(directory: str, repo_owner: str, repo_name: str, repo_path: str, suffix: str = ".json") -> str:
+    """
+    Get the file in a state directory that belongs to a repository path
+    
+    Args:
+        directory: State directory
+        repo_owner: Repository owner
+        repo_name: Repository name
+        repo_path: Path within the repository
+        suffix: End of the file name, after the repository and path key
+        
+    Returns:
+        Path of the file
+    """
+    key = hashlib.sha1(f"{repo_owner}/{repo_name}:{repo_path.strip('/')}".encode("utf-8")).hexdigest()[:12]
+    return os.path.join(directory, f"{repo_owner}__{repo_name}__{key}{suffix}")
+
+def write_json_atomically(path: str, data: Any) -> None:
+    """Write JSON to a temporary file first, so an interrupted run never leaves a corrupt file behind"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temporary_path, path)
+
+def _run_state_path(repo_owner: str, repo_name: str, repo_path: str) -> str:
+    """Get the file holding the run state of a repository path"""
+    return repository_state_path(RUN_STATE_DIR, repo_owner, repo_name, repo_path)
+
+def load_run_state(repo_owner: str, repo_name: str, repo_path: str = "") -> Optional[Dict[str, Any]]:
+    """
+    Load what the previous run documented for a repository path
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        repo_path: Path within the repository
+        
+    Returns:
+        Dictionary with the documented "commit" and a "files" manifest mapping
+        each path to its blob SHA and documentation, or None before the first run
+    """
+    try:
+        with open(_run_state_path(repo_owner, repo_name, repo_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_run_state(
+    repo_owner: str,
+    repo_name: str,
+    repo_path: str,
+    commit_sha: str,
+    files: Dict[str, Dict[str, str]]
+) -> None:
+    """
+    Remember the commit and documentation of a completed run
+    
+    Args:
+        repo_owner: Repository owner
+        repo_name: Repository name
+        repo_path: Path within the repository
+        commit_sha: Commit that was documented
+        files: Manifest mapping each documented path to its blob SHA and documentation
+    """
+    write_json_atomically(_run_state_path(repo_owner, repo_name, repo_path), {"commit": commit_sha, "files": files})
+
+def plan_incremental_run(
+    files: List[Dict[str, Any]],
+    previous_files: Dict[str, Dict[str, str]],
+    changes: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Narrow the selected files down to those a commit comparison reports as changed
+    
+    Files that were only renamed keep their previous documentation, retitled
+    for the new name, so they need no new analysis. Changed files that were
+    documented before carry that documentation and GitHub's diff, so it can
+    be revised instead of regenerated.
+    
+    Args:
+        files: File information dictionaries selected for this run
+        previous_files: Manifest of the previous run, keyed by path
+        changes: Changed files reported by compare_commits
+        
+    Returns:
+        Tuple of (files to document, paths whose documentation should be retired)
+    """
+    changes_by_path = {change["filename"]: change for change in changes}
+    
+    selected = []
+    for file in files:
+        change = changes_by_path.get(file["path"])
+        if change is None:
+            # Unchanged since the previous run; only files it never documented need work
+            if file["path"] not in previous_files:
+                selected.append(file)
+            continue
+        
+        previous = previous_files.get(change.get("previous_filename") or change["filename"])
+        if change["status"] == "renamed" and previous and previous["sha"] == file["sha"]:
+            file = {**file, "documentation": retitle_documentation(previous["documentation"], file["name"])}
+        elif change["status"] in ("modified", "changed", "renamed") and previous and change.get("patch"):
+            file = {**file, "previous_documentation": previous["documentation"], "patch": change["patch"]}
+        selected.append(file)
+    
+    retired = []
+    for change in changes:
+        if change["status"] == "removed" and change["filename"] in previous_files:
+            retired.append(change["filename"])
+        elif change["status"] == "renamed" and change.get("previous_filename") in previous_files:
+            retired.append(change["previous_filename"])
+    
+    return selected, retired
\ No newline at end of file
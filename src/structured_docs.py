@@ -0,0 +1,137 @@
+import ast
+import re
+from typing import List, Optional
+from pydantic import BaseModel, Field, ValidationError
+
+from src.python_skeleton import build_python_skeleton
+
+class ParameterDoc(BaseModel):
+    """Documentation of one parameter"""
+    name: str
+    type: str = ""
+    description: str = ""
+
+class SymbolDoc(BaseModel):
+    """Documentation of one top-level class or function"""
+    name: str = Field(description="Name of the class or function exactly as defined")
+    description: str = Field(description="What it does; for classes, also their methods")
+    parameters: List[ParameterDoc] = Field(default_factory=list)
+    returns: str = Field(default="", description="Return type and description, empty for classes")
+    example: str = Field(default="", description="Short example code using it")
+
+class DependencyDoc(BaseModel):
+    """Documentation of one import"""
+    name: str
+    purpose: str = ""
+
+class FileDocReply(BaseModel):
+    """What the model returns for a file in structured mode"""
+    overview: str = Field(default="", description="Brief description of the file's purpose")
+    dependencies: List[DependencyDoc] = Field(default_factory=list)
+    implementation_details: str = Field(default="", description="Important implementation details, algorithms or design patterns")
+    symbols: List[SymbolDoc] = Field(default_factory=list)
+
+class PythonSymbol(BaseModel):
+    """A top-level class or function and its source span"""
+    name: str
+    kind: str
+    source: str
+
+def extract_python_symbols(code: str) -> Optional[List[PythonSymbol]]:
+    """
+    Find the top-level classes and functions of a Python module
+    
+    Args:
+        code: Python source code
+        
+    Returns:
+        Each symbol with its source including decorators, in file order, or
+        None if the code cannot be parsed
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    
+    lines = code.splitlines()
+    symbols = []
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        first = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        symbols.append(PythonSymbol(
+            name=node.name,
+            kind="class" if isinstance(node, ast.ClassDef) else "function",
+            source="\n".join(lines[first - 1:node.end_lineno])
+        ))
+    return symbols
+
+def module_outline(code: str) -> str:
+    """
+    Reduce a Python module to what its overview depends on
+    
+    Args:
+        code: Python source code
+        
+    Returns:
+        The module with every function body elided: imports, signatures,
+        docstrings and module-level code
+    """
+    outline, _ = build_python_skeleton(code, 0)
+    return outline
+
+def parse_reply(text: str) -> Optional[FileDocReply]:
+    """
+    Validate the model's JSON reply
+    
+    Args:
+        text: Reply content, possibly wrapped in a code fence
+        
+    Returns:
+        The parsed reply, or None if it does not match the schema
+    """
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    try:
+        return FileDocReply.model_validate_json(text)
+    except ValidationError:
+        return None
+
+def render_markdown(filename: str, language: str, reply: FileDocReply, symbols: List[SymbolDoc]) -> str:
+    """
+    Render structured documentation in the Markdown layout of the file template
+    
+    Args:
+        filename: Name of the file
+        language: Language name, used for example code blocks
+        reply: File-level documentation (overview, dependencies, details)
+        symbols: Documentation of each symbol, in file order
+        
+    Returns:
+        Documentation in Markdown format
+    """
+    parts = [f"# File: {filename}", "## Overview", reply.overview or "(No overview)"]
+    
+    parts.append("## Dependencies")
+    if reply.dependencies:
+        parts.append("\n".join(f"- `{dependency.name}`: {dependency.purpose}" for dependency in reply.dependencies))
+    else:
+        parts.append("None")
+    
+    parts.append("## Components")
+    for symbol in symbols:
+        parts.extend([f"### {symbol.name}", symbol.description])
+        if symbol.parameters:
+            parts.append("#### Parameters")
+            parts.append("\n".join(
+                f"- `{parameter.name}` ({parameter.type or 'Any'}): {parameter.description}"
+                for parameter in symbol.parameters
+            ))
+        if symbol.returns:
+            parts.extend(["#### Returns", f"- {symbol.returns}"])
+        if symbol.example:
+            parts.extend(["#### Example Usage", f"```{language.lower()}\n{symbol.example.strip()}\n```"])
+    
+    if reply.implementation_details:
+        parts.extend(["## Implementation Details", reply.implementation_details])
+    
+    return "\n\n".join(part.strip() for part in parts) + "\n"
\ No newline at end of file
@@ -0,0 +1,89 @@
+import math
+from functools import lru_cache
+from typing import List, Optional
+
+import tiktoken
+from langchain.schema import BaseMessage
+
+# Rough number of characters per token for source code and English prose
+CHARS_PER_TOKEN = 4
+
+# Tokens the chat format adds around every message, and to prime the reply
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Approximate token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def estimate_message_tokens(messages: List[BaseMessage]) -> int:
+    """
+    Estimate the prompt tokens of a list of chat messages
+    
+    Args:
+        messages: Chat messages sent to the model
+        
+    Returns:
+        Approximate prompt token count
+    """
+    return sum(estimate_tokens(message.content) + TOKENS_PER_MESSAGE for message in messages)
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> Optional[tiktoken.Encoding]:
+    """
+    Get the tokenizer of a model
+    
+    Args:
+        model: OpenAI model name
+        
+    Returns:
+        The model's encoding, or None if it cannot be loaded (tiktoken
+        downloads encodings on first use)
+    """
+    try:
+        encoding_name = tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        encoding_name = "cl100k_base"
+    
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        print(f"Error loading tokenizer for {model}, falling back to estimates: {str(e)}")
+        return None
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Count the tokens of a piece of text with the model's tokenizer
+    
+    Args:
+        text: Text to measure
+        model: OpenAI model name
+        
+    Returns:
+        Exact token count, or an estimate when the tokenizer is unavailable
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def count_message_tokens(messages: List[BaseMessage], model: str) -> int:
+    """
+    Count the prompt tokens of a list of chat messages with the model's tokenizer
+    
+    Args:
+        messages: Chat messages sent to the model
+        model: OpenAI model name
+        
+    Returns:
+        Prompt token count, exact unless the tokenizer is unavailable
+    """
+    return sum(count_tokens(message.content, model) + TOKENS_PER_MESSAGE for message in messages) + TOKENS_PER_REPLY
\ No newline at end of file
@@ -1,15 +1,26 @@
 import os
-from typing import Dict, List, Any, Annotated, TypedDict
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Any, Annotated, Optional, TypedDict
+from typing_extensions import NotRequired
 from dotenv import load_dotenv
-from langchain.chat_models import ChatOpenAI
 from langgraph.graph import StateGraph, END
-from langchain.schema import SystemMessage, HumanMessage, AIMessage
 import requests
 from pydantic import BaseModel, Field
 
 # Import our modules
-from github_fetcher import fetch_repo_files, get_file_content
-from confluence_updater import create_or_update_confluence_page
+from src.github_fetcher import GITHUB_WALK_WORKERS, compare_commits, fetch_repo_tree, get_file_content, get_file_contents_batch, resolve_ref
+from src.archive_fetcher import iter_archive_files
+from src.git_source import iter_clone_files
+from src.async_fetcher import fetch_files_concurrently
+from src.file_selector import FileSelector
+from src.confluence_updater import create_or_update_confluence_page
+from src.code_analyzer import analyze_files, retitle_documentation
+from src.hedging import get_hedge_tracker
+from src.run_state import load_run_state, plan_incremental_run, save_run_state
+from src.estimator import estimate_run, model_prices
+from src.batch_runner import run_batch
 
 # Load environment variables
 load_dotenv()
@@ -19,27 +30,34 @@ class FileInfo(TypedDict):
     name: str
     path: str
     download_url: str
+    sha: str
+    size: int
     content: str
     documentation: str
+    previous_documentation: NotRequired[str]
+    patch: NotRequired[str]
     
 class WorkflowState(TypedDict):
     repo_owner: str
     repo_name: str
     repo_path: str
+    source_backend: str
+    incremental: bool
+    dry_run: bool
+    batch: bool
+    commit_sha: str
+    selector: FileSelector
     files: List[FileInfo]
     current_file_index: int
+    blob_documentation: Dict[str, str]
+    report: Dict[str, Any]
+    deleted_files: List[str]
+    estimate: Dict[str, Any]
     confluence_space_key: str
     parent_page_id: str
     completed: bool
     error: str
 
-# Initialize our LLM
-llm = ChatOpenAI(
-    model="gpt-4",
-    temperature=0,
-    openai_api_key=os.getenv("OPENAI_API_KEY")
-)
-
 # Define our nodes (agents)
 
 def github_fetcher(state: WorkflowState) -> WorkflowState:
@@ -49,31 +67,100 @@ def github_fetcher(state: WorkflowState) -> WorkflowState:
         repo_name = state["repo_name"]
         repo_path = state.get("repo_path", "")
         
-        files_data = fetch_repo_files(repo_owner, repo_name, repo_path)
+        # Pin the run to one commit so listings and content lookups match
+        commit_sha, _ = resolve_ref(repo_owner, repo_name)
+        selector = FileSelector.from_repository(repo_owner, repo_name, commit_sha)
+        
+        source_backends = {
+            "archive": iter_archive_files,
+            "clone": iter_clone_files,
+            "async": fetch_files_concurrently
+        }
+        source_backend = state.get("source_backend", "api")
+        if source_backend in source_backends:
+            # Contents arrive together with the listing
+            iter_files = source_backends[source_backend]
+            files = [
+                file for file in iter_files(repo_owner, repo_name, repo_path, commit_sha, file_filter=selector.select_path)
+                if selector.select_content(file["path"], file["content"])
+            ]
+            if not files:
+                return {**state, "error": "Failed to fetch files from GitHub", "completed": True}
+        else:
+            files_data = fetch_repo_tree(repo_owner, repo_name, repo_path, commit_sha)
         
-        if not files_data:
-            return {**state, "error": "Failed to fetch files from GitHub", "completed": True}
+            if not files_data:
+                return {**state, "error": "Failed to fetch files from GitHub", "completed": True}
         
-        # Filter only for code files
-        code_extensions = ['.py', '.js', '.ts', '.java', '.c', '.cpp', '.cs', '.go', '.rb', '.php']
-        files = []
+            # Filter out non-code, vendored, generated and oversized files
+            files = []
         
-        for file in files_data:
-            if file["type"] == "file" and any(file["name"].endswith(ext) for ext in code_extensions):
+            for file in selector.select(files_data):
                 files.append({
                     "name": file["name"],
                     "path": file["path"],
                     "download_url": file["download_url"],
+                    "sha": file["sha"],
+                    "size": file["size"],
                     "content": "",
                     "documentation": ""
                 })
         
-        return {**state, "files": files, "current_file_index": 0}
+        # Only regenerate what changed since the last documented commit
+        previous_run = load_run_state(repo_owner, repo_name, repo_path) if state.get("incremental") else None
+        deleted_files = []
+        if previous_run:
+            if previous_run["commit"] == commit_sha:
+                changes = []
+            else:
+                changes = compare_commits(repo_owner, repo_name, previous_run["commit"], commit_sha)
+            
+            if changes is not None:
+                selected_count = len(files)
+                files, deleted_files = plan_incremental_run(files, previous_run["files"], changes)
+                state["report"]["unchanged_files"] = selected_count - len(files)
+                state["report"]["deleted_files"] = deleted_files
+        
+        if source_backend == "graphql":
+            # Fetch contents in a few GraphQL queries; binary files come back empty and are dropped
+            pending = [file for file in files if not file["documentation"]]
+            contents = get_file_contents_batch(repo_owner, repo_name, pending, commit_sha)
+            files = [
+                {**file, "content": contents.get(file["path"], "")} for file in files
+                if file["documentation"] or (
+                    file["path"] in contents and selector.select_content(file["path"], contents[file["path"]])
+                )
+            ]
+        
+        state = {
+            **state, "files": files, "current_file_index": 0, "commit_sha": commit_sha, "selector": selector,
+            "deleted_files": deleted_files
+        }
+        if not files:
+            # Nothing to regenerate; record the commit so the next comparison starts here
+            record_documented_files(state)
+        return state
     except Exception as e:
         return {**state, "error": f"Error in GitHub fetcher: {str(e)}", "completed": True}
 
-def code_analyzer(state: WorkflowState) -> WorkflowState:
-    """Analyze code and generate documentation"""
+def code_analyzer(
+    state: WorkflowState,
+    on_token: Optional[Callable[[FileInfo, str], None]] = None,
+    on_file: Optional[Callable[[FileInfo], None]] = None
+) -> WorkflowState:
+    """
+    Analyze code and generate documentation for all remaining files concurrently
+    
+    Args:
+        state: Workflow state
+        on_token: Optional callback receiving (file, piece of documentation)
+            while documentation is generated
+        on_file: Optional callback receiving each file once its documentation
+            is final
+            
+    Returns:
+        The updated workflow state
+    """
     try:
         if not state["files"]:
             return {**state, "completed": True}
@@ -82,42 +169,141 @@ def code_analyzer(state: WorkflowState) -> WorkflowState:
         if current_idx >= len(state["files"]):
             return {**state, "completed": True}
         
-        current_file = state["files"][current_idx]
+        # Renamed files arrive with their previous documentation
+        remaining = [
+            index for index in range(current_idx, len(state["files"]))
+            if not state["files"][index]["documentation"]
+        ]
         
-        # Get file content if not already fetched
-        if not current_file["content"]:
-            content = get_file_content(current_file["download_url"])
-            state["files"][current_idx]["content"] = content
-        else:
-            content = current_file["content"]
-        
-        # Define our prompt for code analysis
-        messages = [
-            SystemMessage(content="""You are a technical documentation expert specializing in code analysis.
-            Analyze the provided code and create comprehensive documentation that includes:
-            1. A high-level overview of what the file does
-            2. A detailed breakdown of each function/class/component
-            3. Parameters, return values, and their types
-            4. Dependencies and their purposes
-            5. Any important implementation details or design patterns
-            
-            Format the documentation in Markdown with appropriate headings, code blocks, and sections.
-            """),
-            HumanMessage(content=f"File: {current_file['name']}\n\nCode:\n```\n{content}\n```\n\nPlease generate comprehensive technical documentation for this file.")
+        # Files sharing a blob SHA are byte-identical; only the first copy is downloaded and analyzed
+        blob_documentation = state["blob_documentation"]
+        unique = []
+        duplicates = []
+        unique_blobs = set()
+        for index in remaining:
+            sha = state["files"][index].get("sha")
+            if sha and (sha in blob_documentation or sha in unique_blobs):
+                duplicates.append(index)
+                continue
+            unique.append(index)
+            if sha:
+                unique_blobs.add(sha)
+        
+        # Get file contents if not already fetched
+        missing = [index for index in unique if not state["files"][index]["content"]]
+        with ThreadPoolExecutor(max_workers=GITHUB_WALK_WORKERS) as executor:
+            contents = executor.map(get_file_content, [state["files"][index]["download_url"] for index in missing])
+            for index, content in zip(missing, contents):
+                state["files"][index]["content"] = content
+        
+        # Binary and oversized files come back empty; minified and generated
+        # files are only recognisable once their content is known
+        selector = state.get("selector") or FileSelector()
+        pending = [
+            index for index in unique
+            if selector.select_content(state["files"][index]["path"], state["files"][index]["content"])
         ]
         
-        # Get documentation from LLM
-        response = llm(messages)
-        documentation = response.content
+        # Files carried over from the previous run are final already
+        if on_file:
+            for index in range(current_idx, len(state["files"])):
+                if state["files"][index]["documentation"]:
+                    on_file(state["files"][index])
+        
+        pending_files = [(state["files"][index]["content"], state["files"][index]["name"]) for index in pending]
+        
+        # In batch mode the Batch API documents what it can; the rest is analyzed directly
+        results = [None] * len(pending)
+        if state.get("batch"):
+            batch_documentation, state["report"]["batch"] = run_batch(
+                pending_files, state["repo_owner"], state["repo_name"], state.get("repo_path", ""),
+                paths=[state["files"][index]["path"] for index in pending]
+            )
+            for position, documentation in enumerate(batch_documentation):
+                if documentation is not None:
+                    results[position] = (documentation, {"cache_hit": False, "batch": True})
+                    if on_file:
+                        on_file({**state["files"][pending[position]], "documentation": documentation})
+        direct = [position for position, result in enumerate(results) if result is None]
+        
+        def stream_token(position: int, delta: str) -> None:
+            on_token(state["files"][pending[direct[position]]], delta)
         
-        # Update the state with documentation
-        state["files"][current_idx]["documentation"] = documentation
+        def finish_file(position: int, documentation: str, stats: Dict[str, Any]) -> None:
+            on_file({**state["files"][pending[direct[position]]], "documentation": documentation})
         
-        # Move to the next file
-        return {**state, "current_file_index": current_idx + 1}
+        # Generate documentation, or reuse it from the cache if this code was seen before
+        hedge_tracker = get_hedge_tracker()
+        hedge_tracker.reset()
+        # Changed files documented by the previous run are revised from their diff
+        previous = [
+            (state["files"][pending[position]].get("previous_documentation"), state["files"][pending[position]].get("patch"))
+            for position in direct
+        ]
+        direct_results = analyze_files(
+            [pending_files[position] for position in direct],
+            on_token=stream_token if on_token else None,
+            on_file=finish_file if on_file else None,
+            previous=previous,
+            paths=[state["files"][pending[position]]["path"] for position in direct]
+        )
+        for position, result in zip(direct, direct_results):
+            results[position] = result
+        
+        for index, (documentation, stats) in zip(pending, results):
+            if stats.get("cache_hit"):
+                state["report"]["doc_cache_hits"] = state["report"].get("doc_cache_hits", 0) + 1
+            elif not stats.get("batch"):
+                # Prompt savings and prompt cache hits next to generation time, per file
+                state["report"].setdefault("file_stats", {})[state["files"][index]["path"]] = {
+                    "route": stats.get("route"),
+                    "tokens_saved": stats.get("tokens_saved", 0),
+                    "cached_tokens": stats.get("cached_tokens", 0),
+                    "seconds": round(stats.get("seconds", 0.0), 2)
+                }
+                llm_usage = state["report"].setdefault("llm_usage", {})
+                for name in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+                    llm_usage[name] = llm_usage.get(name, 0) + stats.get(name, 0)
+                record_route(state["report"], stats)
+        
+            # Update the state with documentation
+            state["files"][index]["documentation"] = documentation
+            if state["files"][index].get("sha"):
+                blob_documentation[state["files"][index]["sha"]] = documentation
+        
+        # Call latency percentiles, with and without hedged requests
+        hedging = hedge_tracker.summary()
+        if hedging["requests"]:
+            state["report"]["hedging"] = hedging
+        
+        for index in duplicates:
+            current_file = state["files"][index]
+            # Copies of a skipped file are skipped with it
+            documentation = blob_documentation.get(current_file["sha"])
+            if documentation is None:
+                continue
+            state["files"][index]["documentation"] = retitle_documentation(documentation, current_file["name"])
+            state["report"]["dedup_saved_calls"] = state["report"].get("dedup_saved_calls", 0) + 1
+            if on_file:
+                on_file(state["files"][index])
+        
+        # All files are processed
+        return {**state, "current_file_index": len(state["files"])}
     except Exception as e:
         return {**state, "error": f"Error in code analyzer: {str(e)}", "completed": True}
 
+def record_route(report: Dict[str, Any], stats: Dict[str, Any]) -> None:
+    """Add a file's latency and cost to the totals of the model route it took"""
+    model = stats.get("model", "")
+    route = report.setdefault("routes", {}).setdefault(stats.get("route", "strong"), {
+        "model": model, "files": 0, "seconds": 0.0, "mean_seconds": 0.0, "cost": 0.0
+    })
+    prompt_price, completion_price = model_prices(model)
+    route["files"] += 1
+    route["seconds"] = round(route["seconds"] + stats.get("seconds", 0.0), 2)
+    route["mean_seconds"] = round(route["seconds"] / route["files"], 2)
+    route["cost"] += (stats.get("prompt_tokens", 0) * prompt_price + stats.get("completion_tokens", 0) * completion_price) / 1000
+
 def confluence_updater(state: WorkflowState) -> WorkflowState:
     """Update documentation in Confluence"""
     try:
@@ -127,16 +313,43 @@ def confluence_updater(state: WorkflowState) -> WorkflowState:
         space_key = state["confluence_space_key"]
         parent_id = state["parent_page_id"]
         
+        published = []
         for file in state["files"]:
             if file["documentation"]:
                 title = f"Documentation: {file['name']}"
                 content = file["documentation"]
-                create_or_update_confluence_page(space_key, title, content, parent_id)
+                if create_or_update_confluence_page(space_key, title, content, parent_id):
+                    published.append(file)
+        
+        for path in state.get("deleted_files", []):
+            print(f"Documentation for removed file {path} can be retired")
+        
+        # Only files whose page was updated count as documented for the next incremental run
+        record_documented_files({**state, "files": published})
         
         return {**state, "completed": True}
     except Exception as e:
         return {**state, "error": f"Error updating Confluence: {str(e)}", "completed": True}
 
+def record_documented_files(state: WorkflowState) -> None:
+    """Remember the documented commit and files for the next incremental run"""
+    if not state.get("incremental") or state.get("dry_run") or not state.get("commit_sha"):
+        return
+    
+    repo_owner = state["repo_owner"]
+    repo_name = state["repo_name"]
+    repo_path = state.get("repo_path", "")
+    
+    previous_run = load_run_state(repo_owner, repo_name, repo_path)
+    manifest = previous_run["files"] if previous_run else {}
+    for path in state.get("deleted_files", []):
+        manifest.pop(path, None)
+    for file in state["files"]:
+        if file["documentation"]:
+            manifest[file["path"]] = {"sha": file["sha"], "documentation": file["documentation"]}
+    
+    save_run_state(repo_owner, repo_name, repo_path, state["commit_sha"], manifest)
+
 # Define our routing logic
 def should_continue(state: WorkflowState) -> str:
     """Determine the next step in the workflow"""
@@ -161,7 +374,11 @@ def create_workflow() -> StateGraph:
     
     # Add our edges
     workflow.add_edge("github_fetcher", "code_analyzer")
-    workflow.set_conditional_edge("code_analyzer", should_continue)
+    workflow.add_conditional_edges("code_analyzer", should_continue, {
+        "code_analyzer": "code_analyzer",
+        "confluence_updater": "confluence_updater",
+        "end": END
+    })
     workflow.add_edge("confluence_updater", END)
     
     # Set the entry point
@@ -169,13 +386,51 @@ def create_workflow() -> StateGraph:
     
     return workflow
 
+def create_initial_state(
+    repo_owner: str,
+    repo_name: str,
+    repo_path: str,
+    confluence_space_key: str,
+    parent_page_id: str,
+    source_backend: str,
+    incremental: bool,
+    dry_run: bool = False,
+    batch: bool = False
+) -> WorkflowState:
+    """Create the state a workflow run starts from"""
+    return {
+        "repo_owner": repo_owner,
+        "repo_name": repo_name,
+        "repo_path": repo_path,
+        "source_backend": source_backend,
+        "incremental": incremental,
+        "dry_run": dry_run,
+        "batch": batch,
+        "commit_sha": "",
+        "selector": FileSelector(),
+        "files": [],
+        "current_file_index": 0,
+        "blob_documentation": {},
+        "report": {"dedup_saved_calls": 0, "doc_cache_hits": 0},
+        "deleted_files": [],
+        "estimate": {},
+        "confluence_space_key": confluence_space_key,
+        "parent_page_id": parent_page_id,
+        "completed": False,
+        "error": ""
+    }
+
 # Function to run the workflow
 def run_documentation_workflow(
     repo_owner: str,
     repo_name: str,
     repo_path: str = "",
     confluence_space_key: str = "DEV",
-    parent_page_id: str = os.getenv("PARENT_PAGE_ID", "")
+    parent_page_id: str = os.getenv("PARENT_PAGE_ID", ""),
+    source_backend: str = os.getenv("SOURCE_BACKEND", "api"),
+    incremental: bool = os.getenv("INCREMENTAL_RUNS", "True").lower() in ("true", "1", "t"),
+    dry_run: bool = False,
+    batch: bool = False
 ) -> Dict[str, Any]:
     """
     Run the documentation workflow
@@ -186,6 +441,19 @@ def run_documentation_workflow(
         repo_path: Path within the repository to analyze
         confluence_space_key: Confluence space key
         parent_page_id: Confluence parent page ID
+        source_backend: Where file contents come from: "api" (one request per
+            file), "archive" (a single streamed tarball), "clone" (a cached
+            local clone updated with an incremental fetch), "async"
+            (concurrent listing and downloads) or "graphql" (tree listing
+            plus batched GraphQL blob queries)
+        incremental: Only regenerate files changed since the last documented
+            commit of this repository path
+        dry_run: Only list and filter files, and estimate the tokens, cost
+            and wall time of a real run into the "estimate" entry of the
+            state; no LLM is called and nothing is published
+        batch: Document files through the OpenAI Batch API, which is
+            cheaper but can take hours; a restarted run resumes waiting for
+            the batches already submitted for this repository path
         
     Returns:
         The final state of the workflow
@@ -194,19 +462,77 @@ def run_documentation_workflow(
     workflow = create_workflow()
     
     # Create the initial state
-    initial_state: WorkflowState = {
-        "repo_owner": repo_owner,
-        "repo_name": repo_name,
-        "repo_path": repo_path,
-        "files": [],
-        "current_file_index": 0,
-        "confluence_space_key": confluence_space_key,
-        "parent_page_id": parent_page_id,
-        "completed": False,
-        "error": ""
-    }
+    initial_state = create_initial_state(
+        repo_owner, repo_name, repo_path, confluence_space_key, parent_page_id, source_backend, incremental, dry_run, batch
+    )
+    
+    if dry_run:
+        state = github_fetcher(initial_state)
+        if state.get("error"):
+            return state
+        return {**state, "estimate": estimate_run(state["files"]), "completed": True}
     
     # Run the workflow
-    result = workflow.invoke(initial_state)
+    result = workflow.compile().invoke(initial_state)
+    
+    return result
+
+def stream_documentation_workflow(
+    repo_owner: str,
+    repo_name: str,
+    repo_path: str = "",
+    confluence_space_key: str = "DEV",
+    parent_page_id: str = os.getenv("PARENT_PAGE_ID", ""),
+    source_backend: str = os.getenv("SOURCE_BACKEND", "api"),
+    incremental: bool = os.getenv("INCREMENTAL_RUNS", "True").lower() in ("true", "1", "t")
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run the documentation workflow, reporting progress while it runs
+    
+    The nodes run in a background thread; documentation is streamed from the
+    LLM so callers can show each file while it is being written.
+    
+    Args:
+        repo_owner: GitHub repository owner
+        repo_name: GitHub repository name
+        repo_path: Path within the repository to analyze
+        confluence_space_key: Confluence space key
+        parent_page_id: Confluence parent page ID
+        source_backend: Where file contents come from, as for run_documentation_workflow
+        incremental: Only regenerate files changed since the last documented
+            commit of this repository path
+            
+    Yields:
+        Event dictionaries: {"event": "files", "files": [...]} once the files
+        to document are known, {"event": "token", "path": ..., "delta": ...}
+        for every piece of generated documentation, {"event": "file",
+        "file": ...} when a file's documentation is final, and finally
+        {"event": "done", "state": ...} with the final workflow state
+    """
+    events = queue.Queue()
+    
+    def run() -> None:
+        state = create_initial_state(
+            repo_owner, repo_name, repo_path, confluence_space_key, parent_page_id, source_backend, incremental
+        )
+        try:
+            state = github_fetcher(state)
+            if not state.get("completed"):
+                events.put({"event": "files", "files": state["files"]})
+                state = code_analyzer(
+                    state,
+                    on_token=lambda file, delta: events.put({"event": "token", "path": file["path"], "delta": delta}),
+                    on_file=lambda file: events.put({"event": "file", "file": file})
+                )
+            if not state.get("error"):
+                state = confluence_updater(state)
+        finally:
+            events.put({"event": "done", "state": state})
+    
+    threading.Thread(target=run, daemon=True).start()
     
-    return result
\ No newline at end of file
+    while True:
+        event = events.get()
+        yield event
+        if event["event"] == "done":
+            return
\ No newline at end of file
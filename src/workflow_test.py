@@ -13,8 +13,9 @@ if MOCK_MODE:
     init_mock_environment()
 
 # Now import components (either real or mock depending on MOCK_MODE)
-from src.github_fetcher import fetch_repo_files, get_file_content
-from src.code_analyzer import analyze_code, analyze_repository_structure, generate_readme
+from src.github_fetcher import fetch_repo_tree, get_file_content
+from src.file_selector import FileSelector
+from src.code_analyzer import analyze_code, analyze_repository_structure, generate_readme, retitle_documentation
 from src.confluence_updater import create_or_update_confluence_page, get_confluence_space_key
 
 class FileInfo(dict):
@@ -58,6 +59,7 @@ def run_documentation_workflow_test(
         "repo_path": repo_path,
         "files": [],
         "current_file_index": 0,
+        "report": {"dedup_saved_calls": 0},
         "confluence_space_key": confluence_space_key,
         "parent_page_id": parent_page_id,
         "completed": False,
@@ -66,32 +68,41 @@ def run_documentation_workflow_test(
     
     # Step 1: Fetch files
     print(f"Fetching files from repository: {repo_owner}/{repo_name}, path: {repo_path}")
-    files_data = fetch_repo_files(repo_owner, repo_name, repo_path)
+    files_data = fetch_repo_tree(repo_owner, repo_name, repo_path)
     
     if not files_data:
         state["error"] = "Failed to fetch files from GitHub"
         state["completed"] = True
         return state
     
-    # Filter only for code files
-    code_extensions = ['.py', '.js', '.ts', '.java', '.c', '.cpp', '.cs', '.go', '.rb', '.php']
+    # Filter out non-code, vendored, generated and oversized files
+    selector = FileSelector.from_repository(repo_owner, repo_name)
     files = []
     
-    for file in files_data:
-        if file["type"] == "file" and any(file["name"].endswith(ext) for ext in code_extensions):
-            files.append(FileInfo({
-                "name": file["name"],
-                "path": file["path"],
-                "download_url": file["download_url"],
-                "content": "",
-                "documentation": ""
-            }))
+    for file in selector.select(files_data):
+        files.append(FileInfo({
+            "name": file["name"],
+            "path": file["path"],
+            "download_url": file["download_url"],
+            "sha": file["sha"],
+            "size": file["size"],
+            "content": "",
+            "documentation": ""
+        }))
     
     state["files"] = files
     
-    # Step 2: Analyze code
+    # Step 2: Analyze code, once per unique blob
     print(f"Analyzing {len(files)} files...")
+    blob_documentation = {}
     for i, file in enumerate(files):
+        if file["sha"] in blob_documentation:
+            print(f"Reusing documentation for identical file {i+1}/{len(files)}: {file['name']}")
+            state["files"][i]["documentation"] = retitle_documentation(blob_documentation[file["sha"]], file["name"])
+            state["report"]["dedup_saved_calls"] += 1
+            state["current_file_index"] = i + 1
+            continue
+        
         # Simulate processing time
         time.sleep(0.5)
         
@@ -101,9 +112,14 @@ def run_documentation_workflow_test(
         content = get_file_content(file["download_url"])
         state["files"][i]["content"] = content
         
+        if not selector.select_content(file["path"], content):
+            print(f"Skipping generated or minified file: {file['name']}")
+            continue
+        
         # Generate documentation
         documentation = analyze_code(content, file["name"])
         state["files"][i]["documentation"] = documentation
+        blob_documentation[file["sha"]] = documentation
         
         # Update state
         state["current_file_index"] = i + 1
@@ -33,6 +33,7 @@ def main():
         print(f"Error: {result['error']}")
     else:
         print(f"Files processed: {len(result['files'])}")
+        print(f"LLM calls saved by deduplication: {result['report']['dedup_saved_calls']}")
         
         print("\nDocumented files:")
         for file in result["files"]:
@@ -0,0 +1,179 @@
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Keep batch state and cached documentation away from the real caches
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["BATCH_STATE_DIR"] = tempfile.mkdtemp()
+os.environ["DOC_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "documentation.sqlite")
+
+import openai
+
+from src import batch_runner, file_selector, workflow
+from src.batch_runner import load_batch_state, run_batch
+
+SAMPLE_FILES = [
+    ("def add(a, b):\n    return a + b\n", "math_utils.py"),
+    ("import math_utils\n\nprint(math_utils.add(1, 2))\n", "main.py"),
+    ("export const greet = (name) => `Hello ${name}`;\n", "greet.js")
+]
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the OpenAI Files and Batch APIs"""
+    protocol_version = "HTTP/1.1"
+    
+    def send_json(self, status: int, body: dict) -> None:
+        """Send a JSON response"""
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/v1/files":
+            # Keep the JSONL lines of the multipart upload
+            file_id = f"file-{len(server.files) + 1}"
+            server.files[file_id] = [
+                json.loads(line) for line in body.decode("utf-8").splitlines() if line.startswith('{"custom_id"')
+            ]
+            self.send_json(200, {"id": file_id, "object": "file", "purpose": "batch", "filename": "input.jsonl", "bytes": len(body), "created_at": 0, "status": "processed"})
+        elif self.path == "/v1/batches":
+            request = json.loads(body)
+            batch_id = f"batch-{len(server.batches) + 1}"
+            server.batches[batch_id] = {"input_file_id": request["input_file_id"], "polls": 0}
+            self.send_json(200, self.batch(batch_id))
+        else:
+            self.send_json(404, {"error": {"message": "not found"}})
+    
+    def do_GET(self):
+        server = self.server
+        match = re.fullmatch(r"/v1/batches/([\w-]+)", self.path)
+        if match and match.group(1) in server.batches:
+            if server.interrupted:
+                self.send_json(400, {"error": {"message": "simulated restart"}})
+                return
+            server.batches[match.group(1)]["polls"] += 1
+            self.send_json(200, self.batch(match.group(1)))
+            return
+        
+        match = re.fullmatch(r"/v1/files/([\w-]+)/content", self.path)
+        if match and match.group(1) in server.outputs:
+            data = server.outputs[match.group(1)].encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/jsonl")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        self.send_json(404, {"error": {"message": "not found"}})
+    
+    def batch(self, batch_id: str) -> dict:
+        """Describe a batch; it completes on its second poll"""
+        server = self.server
+        batch = server.batches[batch_id]
+        body = {
+            "id": batch_id, "object": "batch", "endpoint": "/v1/chat/completions", "completion_window": "24h",
+            "input_file_id": batch["input_file_id"], "created_at": 0, "status": "in_progress", "output_file_id": None
+        }
+        if batch["polls"] >= 2:
+            output_id = f"output-{batch_id}"
+            server.outputs[output_id] = "".join(
+                json.dumps({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": self.completion(request)}}) + "\n"
+                for request in server.files[batch["input_file_id"]]
+            )
+            body.update({"status": "completed", "output_file_id": output_id})
+        return body
+    
+    def completion(self, request: dict) -> dict:
+        """Answer a request with documentation titled after its file"""
+        filename = re.search(r"^File: (.+)$", request["body"]["messages"][-1]["content"], re.MULTILINE).group(1)
+        return {
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": f"# File: {filename}\n\nBatch documentation"}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+        }
+    
+    def log_message(self, format, *args):
+        pass
+
+def run_workflow(server: ThreadingHTTPServer) -> tuple:
+    """Run the whole batch-mode workflow, with GitHub and Confluence replaced by in-memory stand-ins"""
+    # New content, so the documentation cached by the direct runs is not reused
+    contents = {
+        filename: f"{code}\n{'#' if filename.endswith('.py') else '//'} documented by the workflow\n"
+        for code, filename in SAMPLE_FILES
+    }
+    published = {}
+    workflow.resolve_ref = lambda repo_owner, repo_name, ref=None: ("commit-sha", "tree-sha")
+    workflow.fetch_repo_tree = lambda repo_owner, repo_name, path="", ref=None: [
+        {"type": "file", "name": filename, "path": filename, "download_url": filename, "sha": f"sha-{filename}", "size": len(code)}
+        for filename, code in contents.items()
+    ]
+    workflow.get_file_content = lambda download_url: contents[download_url]
+    file_selector.get_file_content_by_path = lambda repo_owner, repo_name, path, ref=None: ""
+    workflow.create_or_update_confluence_page = lambda space_key, title, content, parent_id: published.setdefault(title, content)
+    batch_runner.OPENAI_BASE_URL = f"http://127.0.0.1:{server.server_port}/v1"
+    
+    state = workflow.run_documentation_workflow("test-owner", "workflow-repo", source_backend="api", incremental=False, batch=True)
+    return state, published
+
+def main():
+    """Run batch mode against the stand-in, with a restart while waiting"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.files, server.batches, server.outputs, server.interrupted = {}, {}, {}, True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = openai.OpenAI(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1", max_retries=0)
+    
+    print("=== Testing Batch Mode ===")
+    
+    # The first run submits its batches, then dies while polling
+    try:
+        run_batch(SAMPLE_FILES, "test-owner", "test-repo", poll_seconds=0, client=client)
+        failed = "run was expected to be interrupted"
+    except openai.BadRequestError:
+        failed = None
+    submitted = len(server.batches)
+    saved = load_batch_state("test-owner", "test-repo")
+    print(f"Submitted {submitted} batches before the restart; {len(saved)} remembered")
+    
+    # The restarted run resumes waiting instead of submitting again
+    server.interrupted = False
+    documentation, stats = run_batch(SAMPLE_FILES, "test-owner", "test-repo", poll_seconds=0, client=client)
+    print(f"Stats after the restart: {stats}")
+    for (_, filename), text in zip(SAMPLE_FILES, documentation):
+        print(f"- {filename}: {text.splitlines()[0] if text else None}")
+    
+    checks = {
+        "first run was interrupted": failed is None,
+        "batches were remembered": len(saved) == submitted > 0,
+        "no batch was submitted twice": len(server.batches) == submitted,
+        "every file was documented": all(text and text.startswith(f"# File: {filename}") for (_, filename), text in zip(SAMPLE_FILES, documentation)),
+        "batch state was cleared": not load_batch_state("test-owner", "test-repo")
+    }
+    
+    # The same files through the whole workflow, from listing to publishing
+    state, published = run_workflow(server)
+    print(f"Workflow batch report: {state['report'].get('batch')}; published {sorted(published)}")
+    checks.update({
+        "workflow ran without error": not state.get("error") and state.get("completed"),
+        "workflow documented through the batch": (state["report"].get("batch") or {}).get("succeeded") == len(SAMPLE_FILES),
+        "workflow published every file": all(
+            published.get(f"Documentation: {filename}", "").startswith(f"# File: {filename}") for _, filename in SAMPLE_FILES
+        )
+    })
+    for check, passed in checks.items():
+        print(f"{'PASS' if passed else 'FAIL'}: {check}")
+    
+    server.shutdown()
+    print("\n=== Test Complete ===")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Small batch limits so a handful of files splits by size and by count
+os.environ["GITHUB_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "github.sqlite")
+os.environ["GITHUB_MAX_RETRIES"] = "0"
+os.environ["GRAPHQL_BATCH_BYTES"] = "100"
+os.environ["GRAPHQL_BATCH_MAX_FILES"] = "3"
+
+from src import github_fetcher
+from src.github_fetcher import get_file_contents_batch
+
+REF = "commit-sha"
+
+# Blobs of the stand-in repository; None is a path the commit does not have
+BLOBS = {
+    "src/app.py": {"byteSize": 60, "isBinary": False, "isTruncated": False, "text": "print('app')\n"},
+    "src/util.py": {"byteSize": 30, "isBinary": False, "isTruncated": False, "text": "def util():\n    pass\n"},
+    "assets/logo.py": {"byteSize": 20, "isBinary": True, "isTruncated": False, "text": None},
+    "src/removed.py": None,
+    "src/config.py": {"byteSize": 10, "isBinary": False, "isTruncated": False, "text": "DEBUG = False\n"},
+    "src/main.py": {"byteSize": 10, "isBinary": False, "isTruncated": False, "text": "import app\n"}
+}
+
+# The byte budget closes the first query, the file limit the second
+EXPECTED_QUERIES = [
+    ["src/app.py", "src/util.py"],
+    ["assets/logo.py", "src/removed.py", "src/config.py"],
+    ["src/main.py"]
+]
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the GitHub GraphQL API"""
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        variables = request["variables"]
+        aliases = re.findall(r"(f\d+): object\(expression: \$(e\d+)\)", request["query"])
+        
+        # Answer the aliases in reverse order, so only their names tie them to the paths
+        paths = []
+        repository = {}
+        for alias, variable in reversed(aliases):
+            ref, path = variables[variable].split(":", 1)
+            self.server.refs.add(ref)
+            paths.insert(0, path)
+            repository[alias] = BLOBS.get(path)
+        self.server.queries.append(paths)
+        
+        data = json.dumps({"data": {"repository": repository}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    """Fetch a few files through batched GraphQL queries against the stand-in"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.queries, server.refs = [], set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    github_fetcher.GITHUB_GRAPHQL_URL = f"http://127.0.0.1:{server.server_port}/graphql"
+    
+    print("=== Testing GraphQL Batching ===")
+    
+    files = [{"path": path, "size": (blob or {"byteSize": 10})["byteSize"]} for path, blob in BLOBS.items()]
+    contents = get_file_contents_batch("test-owner", "test-repo", files, REF)
+    print(f"Queries: {server.queries}")
+    print(f"Fetched: {sorted(contents)}")
+    
+    text_paths = [path for path, blob in BLOBS.items() if blob and not blob["isBinary"]]
+    checks = {
+        "files were batched by size and count": server.queries == EXPECTED_QUERIES,
+        "every query used the requested ref": server.refs == {REF},
+        "aliases map back to their paths": all(contents.get(path) == BLOBS[path]["text"] for path in text_paths),
+        "binary and missing blobs are skipped": set(contents) == set(text_paths)
+    }
+    for check, passed in checks.items():
+        print(f"{'PASS' if passed else 'FAIL'}: {check}")
+    
+    server.shutdown()
+    print("\n=== Test Complete ===")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Hedge early and often, and keep cached documentation away from the real cache
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["DOC_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "documentation.sqlite")
+os.environ["HEDGING_ENABLED"] = "True"
+os.environ["HEDGE_MIN_SAMPLES"] = "3"
+os.environ["HEDGE_PERCENTILE"] = "50"
+os.environ["HEDGE_MAX_EXTRA_RATIO"] = "1"
+os.environ["ROUTING_ENABLED"] = "False"
+
+from langchain.schema import AIMessage, ChatGeneration, LLMResult
+
+from src import code_analyzer
+from src.workflow import code_analyzer as code_analyzer_node, create_initial_state
+
+class StandInLLM:
+    """Chat model stand-in whose first request for module_5.py stalls until a duplicate overtakes it"""
+    
+    def __init__(self):
+        self.stalled = False
+        self.cancelled = 0
+        self.lock = threading.Lock()
+    
+    async def agenerate(self, batch, max_tokens=None):
+        with self.lock:
+            stall = "module_5.py" in batch[0][-1].content and not self.stalled
+            self.stalled = self.stalled or stall
+        try:
+            await asyncio.sleep(2.0 if stall else 0.05)
+        except asyncio.CancelledError:
+            with self.lock:
+                self.cancelled += 1
+            raise
+        return LLMResult(
+            generations=[[ChatGeneration(message=AIMessage(content="# File: stand-in\n\nDocumentation"))]],
+            llm_output={"token_usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}}
+        )
+
+def sample_file(number: int) -> dict:
+    """Build a file large enough to be analyzed on its own"""
+    content = "\n".join(f"def function_{number}_{line}():\n    return {line}\n" for line in range(40))
+    return {
+        "name": f"module_{number}.py", "path": f"module_{number}.py", "download_url": "", "sha": f"sha-{number}",
+        "size": len(content), "content": content, "documentation": ""
+    }
+
+def main():
+    """Run the code analyzer node with hedging and check its report"""
+    print("=== Testing Hedged Requests ===")
+    
+    llm = StandInLLM()
+    code_analyzer._llm_clients[code_analyzer.OPENAI_MODEL] = llm
+    
+    # One file at a time, so the latency samples come before the slow call
+    state = create_initial_state("test-owner", "test-repo", "", "DEV", "", "api", False)
+    for number in range(6):
+        state = {**state, "files": [sample_file(number)], "current_file_index": 0}
+        state = code_analyzer_node(state)
+    
+    hedging = state["report"].get("hedging")
+    print(f"Hedging report of the last file: {hedging}")
+    
+    state = {**state, "files": [sample_file(number) for number in range(6, 12)], "current_file_index": 0}
+    started = time.monotonic()
+    state = code_analyzer_node(state)
+    print(f"Hedging report of a later run: {state['report'].get('hedging')}")
+    
+    checks = {
+        "no error": not state.get("error"),
+        "report has hedging": bool(hedging) and hedging["requests"] == 1,
+        "slow call was hedged": bool(hedging) and hedging["hedges"] == 1 and hedging["hedge_wins"] == 1,
+        "stalled request was cancelled": llm.cancelled == 1,
+        "unhedged latency counts the abandoned call": bool(hedging) and hedging["unhedged"]["p50"] is not None,
+        "hedged latency beats unhedged": bool(hedging) and hedging["hedged"]["p50"] < 1.0,
+        "report resets per run": state["report"]["hedging"]["requests"] == 6 and time.monotonic() - started < 10
+    }
+    for check, passed in checks.items():
+        print(f"{'PASS' if passed else 'FAIL'}: {check}")
+    
+    print("\n=== Test Complete ===")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file